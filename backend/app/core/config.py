@@ -1,8 +1,8 @@
-﻿"""Application settings via pydantic-settings."""
+"""Application settings via pydantic-settings."""
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import List
+from typing import List, Literal
 
 from pydantic import AnyHttpUrl, BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -21,22 +21,49 @@ class Settings(BaseSettings):
 
     jwt_secret: str = Field("devsecret_change_me", alias="JWT_SECRET")
     jwt_expire_min: int = Field(60, alias="JWT_EXPIRE_MIN")
+    bcrypt_rounds: int = Field(12, alias="BCRYPT_ROUNDS")
+    password_hash_workers: int = Field(4, alias="PASSWORD_HASH_WORKERS")
+    principal_cache_size: int = Field(4096, alias="PRINCIPAL_CACHE_SIZE")
+    principal_cache_ttl_seconds: float = Field(60, alias="PRINCIPAL_CACHE_TTL_SECONDS")
 
     smtp_host: str = Field("smtp.mailtrap.io", alias="SMTP_HOST")
     smtp_port: int = Field(2525, alias="SMTP_PORT")
     smtp_user: str = Field("your_user", alias="SMTP_USER")
     smtp_pass: str = Field("your_pass", alias="SMTP_PASS")
     email_from: str = Field("no-reply@swmra.local", alias="EMAIL_FROM")
+    smtp_pool_size: int = Field(4, alias="SMTP_POOL_SIZE")
+
+    notification_batch_size: int = Field(100, alias="NOTIFICATION_BATCH_SIZE")
+    notification_lease_seconds: int = Field(120, alias="NOTIFICATION_LEASE_SECONDS")
+    notification_email_concurrency: int = Field(4, alias="NOTIFICATION_EMAIL_CONCURRENCY")
+    notification_digest_window_seconds: int = Field(60, alias="NOTIFICATION_DIGEST_WINDOW_SECONDS")
+    notification_broadcast_chunk_size: int = Field(5000, alias="NOTIFICATION_BROADCAST_CHUNK_SIZE")
 
     enable_sms: bool = Field(False, alias="ENABLE_SMS")
     enable_push: bool = Field(False, alias="ENABLE_PUSH")
 
     rate_limit_per_min: int = Field(60, alias="RATE_LIMIT_PER_MIN")
+    rate_limit_burst: int | None = Field(None, alias="RATE_LIMIT_BURST")
+    rate_limit_max_keys: int = Field(100_000, alias="RATE_LIMIT_MAX_KEYS")
+    rate_limit_store: Literal["memory", "sqlite"] = Field("memory", alias="RATE_LIMIT_STORE")
+    rate_limit_sqlite_path: str = Field("./data/rate_limit.db", alias="RATE_LIMIT_SQLITE_PATH")
     upload_dir: str = Field("uploads", alias="UPLOAD_DIR")
     storage_base_url: AnyHttpUrl | str = Field("http://localhost:8000", alias="STORAGE_BASE_URL")
 
     slot_capacity_per_day: int = Field(24, alias="SLOT_CAPACITY_PER_DAY")
     special_slot_capacity: int = Field(2, alias="SPECIAL_SLOT_CAPACITY")
+    slot_capacity_per_hour: int = Field(1, alias="SLOT_CAPACITY_PER_HOUR")
+    slot_calendar_max_days: int = Field(512, alias="SLOT_CALENDAR_MAX_DAYS")
+    slot_calendar_ttl_seconds: float = Field(30, alias="SLOT_CALENDAR_TTL_SECONDS")
+
+    ws_queue_size: int = Field(64, alias="WS_QUEUE_SIZE")
+    ws_overflow_policy: Literal["drop_oldest", "disconnect"] = Field("disconnect", alias="WS_OVERFLOW_POLICY")
+    ws_heartbeat_seconds: float = Field(25, alias="WS_HEARTBEAT_SECONDS")
+    ws_replay_limit: int = Field(100, alias="WS_REPLAY_LIMIT")
+    ws_broadcast_rate_per_second: int = Field(5000, alias="WS_BROADCAST_RATE_PER_SECOND")
+    ws_broker: Literal["local", "unix"] = Field("local", alias="WS_BROKER")
+    ws_broker_dir: str = Field("./data/ws", alias="WS_BROKER_DIR")
+    ws_broker_route_ttl_seconds: float = Field(1, alias="WS_BROKER_ROUTE_TTL_SECONDS")
 
     cors_origins: List[AnyHttpUrl | str] = ["http://localhost:5173", "http://127.0.0.1:5173"]
 
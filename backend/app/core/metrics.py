@@ -0,0 +1,65 @@
+"""Process-local counters and latency summaries exposed on ``GET /metrics``."""
+from collections import defaultdict, deque
+from threading import Lock
+
+RECENT_SAMPLES = 1024
+
+
+class Metrics:
+    """Named counters plus summaries (count/sum/max, percentiles over recent samples)."""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._counters: dict[str, int] = defaultdict(int)
+        self._summaries: dict[str, list[float]] = {}
+        self._recent: dict[str, deque[float]] = {}
+
+    def incr(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            summary = self._summaries.get(name)
+            if summary is None:
+                self._summaries[name] = [1, value, value]
+                self._recent[name] = deque([value], maxlen=RECENT_SAMPLES)
+            else:
+                summary[0] += 1
+                summary[1] += value
+                summary[2] = max(summary[2], value)
+                self._recent[name].append(value)
+
+    def counter(self, name: str) -> int:
+        return self._counters.get(name, 0)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "summaries": {
+                    name: {
+                        "count": int(count),
+                        "sum": total,
+                        "avg": total / count,
+                        "max": peak,
+                        **_percentiles(self._recent[name]),
+                    }
+                    for name, (count, total, peak) in self._summaries.items()
+                },
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+            self._recent.clear()
+
+
+def _percentiles(samples: deque[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {"p50": ordered[last // 2], "p95": ordered[last * 95 // 100]}
+
+
+metrics = Metrics()
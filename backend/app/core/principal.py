@@ -0,0 +1,24 @@
+"""Caches behind ``get_current_user``: verified tokens and the principals they name."""
+from ..models.user import UserPublic
+from ..utils.cache import TTLCache
+from .config import get_settings
+
+_settings = get_settings()
+
+# Verified token string -> user id, kept no longer than the token's own ``exp``.
+token_cache: TTLCache[int] = TTLCache(
+    "token",
+    maxsize=_settings.principal_cache_size,
+    ttl_seconds=_settings.jwt_expire_min * 60,
+)
+# User id -> public profile; bounded staleness for changes made by other workers.
+principal_cache: TTLCache[UserPublic] = TTLCache(
+    "principal",
+    maxsize=_settings.principal_cache_size,
+    ttl_seconds=_settings.principal_cache_ttl_seconds,
+)
+
+
+def invalidate_principal(user_id: int) -> None:
+    """Drop the cached profile so the next request reloads role and profile fields."""
+    principal_cache.pop(user_id)
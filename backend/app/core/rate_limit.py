@@ -1,26 +1,225 @@
+"""Per-client rate limiting (GCRA) as HTTP middleware."""
 import asyncio
+import logging
+import math
+import os
+import sqlite3
 import time
-from collections import defaultdict, deque
-from typing import Deque
+from concurrent.futures import ThreadPoolExecutor
 
 from fastapi import HTTPException, Request, status
+from fastapi.responses import JSONResponse
 
 from .config import get_settings
+from .metrics import metrics
+from .security import user_id_from_token
 
-_BUCKETS: dict[str, Deque[float]] = defaultdict(deque)
-_LOCK = asyncio.Lock()
+logger = logging.getLogger(__name__)
 
+# Requests that cost more than one unit of the per-minute budget, matched by
+# (method, path prefix). Expensive or brute-forceable endpoints are weighted up.
+ROUTE_COSTS: dict[tuple[str, str], int] = {
+    ("POST", "/auth/login"): 5,
+    ("POST", "/auth/register"): 5,
+    ("POST", "/files/upload"): 3,
+}
+SWEEP_INTERVAL_SECONDS = 60
+# How long a check waits for another worker's write lock before failing open
+SQLITE_BUSY_TIMEOUT_SECONDS = 0.005
 
-async def rate_limit_middleware(request: Request, call_next):
+
+class MemoryRateLimitStore:
+    """Theoretical arrival times in a process-local dict; O(1) per check, never awaits."""
+
+    clock = staticmethod(time.monotonic)
+    # Checks are cheap enough to run on the event loop
+    executor = None
+
+    def __init__(self, *, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        self._tat: dict[str, float] = {}
+        self._last_sweep = self.clock()
+
+    def acquire(self, key: str, increment: float, tolerance: float, now: float) -> float:
+        if now - self._last_sweep >= SWEEP_INTERVAL_SECONDS:
+            self.sweep(now)
+        new_tat = max(self._tat.get(key, now), now) + increment
+        overshoot = new_tat - now - tolerance
+        if overshoot > 0:
+            return overshoot
+        if key not in self._tat and len(self._tat) >= self.max_keys:
+            # Oldest-inserted key goes first; losing it only makes that client's limit lenient.
+            del self._tat[next(iter(self._tat))]
+        self._tat[key] = new_tat
+        return 0.0
+
+    def sweep(self, now: float) -> int:
+        """Forget keys whose bucket is full again; they are indistinguishable from new keys."""
+        idle = [key for key, tat in self._tat.items() if tat <= now]
+        for key in idle:
+            del self._tat[key]
+        self._last_sweep = now
+        return len(idle)
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+
+class SQLiteRateLimitStore:
+    """Theoretical arrival times in a WAL-mode SQLite file shared by every worker on the host.
+
+    Each check is a single atomic UPSERT, so concurrent workers cannot both spend
+    the last unit of a budget. Wall-clock time is used because monotonic clocks
+    are not comparable across processes. Connections are opened per process.
+
+    The middleware runs checks on ``executor``, one thread per process, so file
+    I/O never blocks the event loop. A check that cannot get the write lock
+    within a few milliseconds, or fails in any other SQLite way, allows the
+    request and counts ``rate_limit.store_errors``.
+    """
+
+    clock = staticmethod(time.time)
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._pid = 0
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_pid = 0
+        self._last_sweep = self.clock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # Worker threads do not survive a fork, so each process gets its own
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rate-limit")
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, isolation_level=None, check_same_thread=False, timeout=SQLITE_BUSY_TIMEOUT_SECONDS
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Limiter state is disposable; skip fsync on every check.
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE IF NOT EXISTS rate_limit (key TEXT PRIMARY KEY, tat REAL NOT NULL) WITHOUT ROWID")
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def acquire(self, key: str, increment: float, tolerance: float, now: float) -> float:
+        if increment > tolerance:
+            return increment - tolerance
+        try:
+            return self._acquire(key, increment, tolerance, now)
+        except sqlite3.Error as exc:
+            logger.warning("Rate limit store unavailable, allowing request: %s", exc)
+            metrics.incr("rate_limit.store_errors")
+            return 0.0
+
+    def _acquire(self, key: str, increment: float, tolerance: float, now: float) -> float:
+        conn = self._connection()
+        if now - self._last_sweep >= SWEEP_INTERVAL_SECONDS:
+            self.sweep(now)
+        row = conn.execute(
+            """
+            INSERT INTO rate_limit (key, tat) VALUES (:key, :now + :inc)
+            ON CONFLICT (key) DO UPDATE SET tat = max(tat, :now) + :inc
+            WHERE max(tat, :now) + :inc - :now <= :tol
+            RETURNING tat
+            """,
+            {"key": key, "now": now, "inc": increment, "tol": tolerance},
+        ).fetchone()
+        if row is not None:
+            return 0.0
+        current = conn.execute("SELECT tat FROM rate_limit WHERE key = ?", (key,)).fetchone()
+        return max((current[0] if current else now) + increment - now - tolerance, 0.001)
+
+    def sweep(self, now: float) -> int:
+        self._last_sweep = now
+        return self._connection().execute("DELETE FROM rate_limit WHERE tat <= ?", (now,)).rowcount
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT count(*) FROM rate_limit").fetchone()[0]
+
+
+RateLimitStore = MemoryRateLimitStore | SQLiteRateLimitStore
+
+
+class GCRARateLimiter:
+    """Generic cell rate algorithm: one "theoretical arrival time" per key.
+
+    Equivalent to a token bucket holding ``burst`` tokens that refills at
+    ``rate_per_min``, but each check is O(1) and the state per key is fixed-size.
+    The store decides where that state lives (this process or the whole host).
+    """
+
+    def __init__(
+        self, *, rate_per_min: int, burst: int | None = None, store: RateLimitStore | None = None
+    ) -> None:
+        self.interval = 60 / rate_per_min
+        self.tolerance = (burst or rate_per_min) * self.interval
+        self.store = MemoryRateLimitStore() if store is None else store
+
+    def hit(self, key: str, cost: int = 1, now: float | None = None) -> float:
+        """Consume ``cost`` units for ``key``; return 0 if allowed, else seconds until it would be."""
+        now = self.store.clock() if now is None else now
+        return self.store.acquire(key, cost * self.interval, self.tolerance, now)
+
+    async def check(self, key: str, cost: int = 1) -> float:
+        """``hit`` for use on the event loop; runs on the store's executor when it has one."""
+        if self.store.executor is None:
+            return self.hit(key, cost)
+        return await asyncio.get_running_loop().run_in_executor(self.store.executor, self.hit, key, cost)
+
+    def sweep(self, now: float | None = None) -> int:
+        return self.store.sweep(self.store.clock() if now is None else now)
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+
+def _settings_limiter() -> GCRARateLimiter:
     settings = get_settings()
-    identifier = request.client.host if request.client else "anonymous"
-    now = time.monotonic()
-    async with _LOCK:
-        bucket = _BUCKETS[identifier]
-        while bucket and now - bucket[0] > 60:
-            bucket.popleft()
-        if len(bucket) >= settings.rate_limit_per_min:
-            raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Slow down")
-        bucket.append(now)
-    response = await call_next(request)
-    return response
\ No newline at end of file
+    if settings.rate_limit_store == "sqlite":
+        store: RateLimitStore = SQLiteRateLimitStore(settings.rate_limit_sqlite_path)
+    else:
+        store = MemoryRateLimitStore(max_keys=settings.rate_limit_max_keys)
+    return GCRARateLimiter(rate_per_min=settings.rate_limit_per_min, burst=settings.rate_limit_burst, store=store)
+
+
+rate_limiter = _settings_limiter()
+
+
+def client_key(request: Request) -> str:
+    """Authenticated requests are limited per user, anonymous ones per IP."""
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            return f"user:{user_id_from_token(token)}"
+        except HTTPException:
+            pass
+    return f"ip:{request.client.host if request.client else 'anonymous'}"
+
+
+def request_cost(request: Request) -> int:
+    path = request.url.path
+    for (method, prefix), cost in ROUTE_COSTS.items():
+        if request.method == method and path.startswith(prefix):
+            return cost
+    return 1
+
+
+async def rate_limit_middleware(request: Request, call_next):
+    retry_after = await rate_limiter.check(client_key(request), request_cost(request))
+    if retry_after:
+        metrics.incr("rate_limit.rejected")
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={"detail": "Slow down"},
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+    return await call_next(request)
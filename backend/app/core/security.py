@@ -1,6 +1,9 @@
 """Security utilities for authentication and authorization."""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Annotated
+from typing import Annotated, Awaitable, Callable, TypeVar
 
 import jwt
 from fastapi import Depends, HTTPException, status
@@ -12,8 +15,16 @@ from ..db.engine import get_session
 from ..models.user import UserPublic
 from ..repositories.user import UserRepository
 from .config import get_settings
+from .metrics import metrics
+from .principal import principal_cache, token_cache
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
+
+_settings = get_settings()
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=_settings.bcrypt_rounds)
+# bcrypt releases the GIL, so a small thread pool both caps concurrent hashes and
+# keeps them off the event loop.
+_hash_pool = ThreadPoolExecutor(max_workers=_settings.password_hash_workers, thread_name_prefix="bcrypt")
 oauth2_scheme = HTTPBearer(auto_error=False)
 
 
@@ -25,24 +36,48 @@ async def get_current_user(
     if not credentials:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing token")
 
-    token = credentials.credentials
-    payload = decode_token(token)
-    user_id = payload.get("sub")
-    if not user_id:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-
-    # Convert string user_id to int
-    try:
-        user_id_int = int(user_id)
-    except ValueError as exc:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
+    user_id = user_id_from_token(credentials.credentials)
+    cached = principal_cache.get(user_id)
+    if cached is not None:
+        return cached
 
     repo = UserRepository()
-    user = await repo.get_by_id(session, user_id_int)
+    user = await repo.get_by_id(session, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
-    return user.to_public()
+    principal = user.to_public()
+    principal_cache.set(user_id, principal)
+    return principal
+
+
+def require_roles(*roles: str) -> Callable[..., Awaitable[UserPublic]]:
+    """Dependency returning the current user, or 403 unless their role is one of ``roles``."""
+
+    async def dependency(current_user: Annotated[UserPublic, Depends(get_current_user)]) -> UserPublic:
+        if current_user.role not in roles:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed for this role")
+        return current_user
+
+    return dependency
+
+
+def user_id_from_token(token: str) -> int:
+    """Verify ``token`` and return its subject, memoized per token string until ``exp``."""
+    user_id = token_cache.get(token)
+    if user_id is not None:
+        return user_id
+
+    payload = decode_token(token)
+    try:
+        user_id = int(payload["sub"])
+    except (KeyError, TypeError, ValueError) as exc:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
+
+    expires_at = payload.get("exp")
+    if isinstance(expires_at, (int, float)):
+        token_cache.set(token, user_id, ttl_seconds=expires_at - time.time())
+    return user_id
 
 
 def create_access_token(subject: str) -> str:
@@ -62,11 +97,30 @@ def decode_token(token: str) -> dict:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
 
 
-def verify_password(plain: str, hashed: str) -> bool:
+async def _run_hash(fn: Callable[..., T], *args) -> T:
+    submitted = time.perf_counter()
+
+    def timed() -> T:
+        started = time.perf_counter()
+        metrics.observe("password_hash.queue_ms", (started - submitted) * 1000)
+        try:
+            return fn(*args)
+        finally:
+            metrics.observe("password_hash.run_ms", (time.perf_counter() - started) * 1000)
+
+    return await asyncio.get_running_loop().run_in_executor(_hash_pool, timed)
+
+
+async def verify_password(plain: str, hashed: str) -> bool:
     """Verify a password against a hash."""
-    return pwd_context.verify(plain, hashed)
+    return await _run_hash(pwd_context.verify, plain, hashed)
+
+
+async def verify_and_update_password(plain: str, hashed: str) -> tuple[bool, str | None]:
+    """Verify a password; also return a new hash if ``hashed`` uses an outdated cost."""
+    return await _run_hash(pwd_context.verify_and_update, plain, hashed)
 
 
-def hash_password(password: str) -> str:
+async def hash_password(password: str) -> str:
     """Hash a password."""
-    return pwd_context.hash(password)
+    return await _run_hash(pwd_context.hash, password)
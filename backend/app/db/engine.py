@@ -7,6 +7,7 @@ from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession as SQLModelAsyncSession
 
 from ..core.config import get_settings
+from .migrations import run_migrations
 
 settings = get_settings()
 
@@ -34,12 +35,16 @@ async def init_db() -> None:
     """Initialize database tables."""
     async with engine.begin() as conn:
         # Import all models to register them with SQLModel
-        from ..models.notification import NotificationDB
-        from ..models.request import PickupRequestDB
+        from ..models.notification import NotificationCounterDB, NotificationDB
+        from ..models.request import PickupRequestDB, RequestEventDB
         from ..models.reward import RewardDB
+        from ..models.slot import SlotCapacityDB
         from ..models.user import UserDB
+        from .indexes import ensure_indexes
 
         await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(run_migrations)
+        await ensure_indexes(conn)
 
 
 async def close_db() -> None:
@@ -1,9 +1,86 @@
-"""Database indexes - SQLModel handles indexes via model definitions."""
+"""Declared database indexes, created idempotently at startup.
 
-# Note: With SQLModel, indexes are defined in the model classes using Field(index=True).
-# No separate index creation is needed. This file is kept for backwards compatibility.
+``SQLModel.metadata.create_all`` only builds indexes together with new tables,
+so databases created before an index was declared pick it up here. Column-level
+``index=True`` indexes from the models are covered as well; this module declares
+the composite and partial indexes the repository queries rely on.
+"""
+from sqlalchemy import Index, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlmodel import SQLModel
 
+from ..models.notification import NotificationDB
+from ..models.request import PickupRequestDB
+from ..models.reward import RewardDB
 
-async def ensure_indexes(db=None) -> None:
-    """Ensure database indexes. SQLModel creates indexes automatically."""
-    pass  # No-op - indexes are created via SQLModel.metadata.create_all
+INDEXES: list[Index] = [
+    # GET /requests: filter by user (+ status), newest first, keyset on (created_at, id)
+    Index(
+        "ix_pickup_requests_user_created",
+        PickupRequestDB.user_id,
+        PickupRequestDB.created_at,
+        PickupRequestDB.id,
+    ),
+    Index(
+        "ix_pickup_requests_user_status_created",
+        PickupRequestDB.user_id,
+        PickupRequestDB.status,
+        PickupRequestDB.created_at,
+        PickupRequestDB.id,
+    ),
+    # Broadcast targeting: distinct requesters by city or pincode, read from the index
+    Index("ix_pickup_requests_city_user", PickupRequestDB.city, PickupRequestDB.user_id),
+    Index("ix_pickup_requests_pincode_user", PickupRequestDB.pincode, PickupRequestDB.user_id),
+    # Notification dispatcher queue
+    Index(
+        "ix_notifications_queued_created",
+        NotificationDB.created_at,
+        sqlite_where=text("status = 'queued'"),
+    ),
+    # Next digest window to come due
+    Index(
+        "ix_notifications_queued_due",
+        NotificationDB.deliver_after,
+        sqlite_where=text("status = 'queued'"),
+    ),
+    # Dispatcher claims: re-read a batch by owner, recover expired leases
+    Index(
+        "ix_notifications_sending_owner",
+        NotificationDB.claimed_by,
+        sqlite_where=text("status = 'sending'"),
+    ),
+    Index(
+        "ix_notifications_sending_lease",
+        NotificationDB.lease_until,
+        sqlite_where=text("status = 'sending'"),
+    ),
+    # Notification inbox (in-app rows only), newest first
+    Index(
+        "ix_notifications_user_channel_created",
+        NotificationDB.user_id,
+        NotificationDB.channel,
+        NotificationDB.created_at,
+        NotificationDB.id,
+    ),
+    # Mark-read and unread recounts only touch a user's unread in-app rows
+    Index(
+        "ix_notifications_unread_user",
+        NotificationDB.user_id,
+        NotificationDB.id,
+        sqlite_where=text("channel = 'inapp' AND read_at IS NULL"),
+    ),
+    # Reward history and totals
+    Index("ix_rewards_user_created", RewardDB.user_id, RewardDB.created_at, RewardDB.points),
+]
+
+
+def _create_indexes(conn: Connection) -> None:
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+async def ensure_indexes(conn: AsyncConnection) -> None:
+    """Create every declared index that does not exist yet."""
+    await conn.run_sync(_create_indexes)
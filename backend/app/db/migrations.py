@@ -0,0 +1,199 @@
+"""Additive schema migrations for existing databases.
+
+``SQLModel.metadata.create_all`` only creates missing tables, so columns added to
+tables that already exist are applied here, together with any backfill they need.
+Every step is idempotent and safe to run on each startup.
+"""
+import json
+import logging
+from typing import Callable
+
+from sqlalchemy import bindparam, inspect, text
+from sqlalchemy.engine import Connection
+
+from ..models.request import address_area
+from ..utils.time import to_naive_utc
+
+logger = logging.getLogger(__name__)
+
+
+def _backfill_slot_columns(conn: Connection) -> None:
+    """Copy ``assigned_slot_json`` into the typed ``slot_start``/``slot_end`` columns."""
+    rows = conn.execute(
+        text(
+            "SELECT id, assigned_slot_json FROM pickup_requests "
+            "WHERE assigned_slot_json IS NOT NULL AND slot_start IS NULL"
+        )
+    ).all()
+    updates = []
+    for row_id, raw in rows:
+        try:
+            slot = json.loads(raw)
+            updates.append(
+                {"id": row_id, "start": to_naive_utc(slot["start"]), "end": to_naive_utc(slot["end"])}
+            )
+        except (KeyError, TypeError, ValueError):
+            logger.warning("Skipping unparsable assigned slot on request %s", row_id)
+    if updates:
+        conn.execute(
+            text("UPDATE pickup_requests SET slot_start = :start, slot_end = :end WHERE id = :id"),
+            updates,
+        )
+        logger.info("Backfilled slot columns for %s requests", len(updates))
+
+
+def _backfill_address_columns(conn: Connection) -> None:
+    """Copy the city and pincode from ``address_json`` into their typed columns."""
+    rows = conn.execute(
+        text("SELECT id, address_json FROM pickup_requests WHERE address_json IS NOT NULL")
+    ).all()
+    updates = []
+    for row_id, raw in rows:
+        try:
+            address = json.loads(raw)
+            updates.append({"id": row_id, **address_area(address)})
+        except (AttributeError, TypeError, ValueError):
+            logger.warning("Skipping unparsable address on request %s", row_id)
+    if updates:
+        conn.execute(
+            text("UPDATE pickup_requests SET city = :city, pincode = :pincode WHERE id = :id"),
+            updates,
+        )
+        logger.info("Backfilled address columns for %s requests", len(updates))
+
+
+# Booked units per (day, hour, category class) of requests that still hold their slot
+_ACTIVE_BOOKINGS = (
+    "SELECT date(slot_start), CAST(strftime('%H', slot_start) AS INTEGER), "
+    "CASE WHEN category IN ('hazardous', 'e-waste') THEN 'special' ELSE 'general' END, "
+    "COUNT(*) FROM pickup_requests "
+    "WHERE slot_start IS NOT NULL AND status NOT IN ('cancelled', 'failed') "
+    "GROUP BY 1, 2, 3"
+)
+
+
+def _rebuild_slot_capacity(conn: Connection) -> None:
+    """Recompute the slot capacity ledger from active bookings, repairing any drift."""
+    actual = {tuple(row) for row in conn.execute(text(_ACTIVE_BOOKINGS))}
+    stored = {
+        tuple(row)
+        for row in conn.execute(text("SELECT day, hour, category_class, booked FROM slot_capacity WHERE booked > 0"))
+    }
+    if actual == stored:
+        return
+    conn.execute(text("DELETE FROM slot_capacity"))
+    conn.execute(text(f"INSERT INTO slot_capacity (day, hour, category_class, booked) {_ACTIVE_BOOKINGS}"))
+    logger.info("Rebuilt slot capacity ledger (%s counters were out of date)", len({row[:3] for row in actual ^ stored}))
+
+
+def _mark_existing_notifications_read(conn: Connection) -> None:
+    """Treat notifications sent before read tracking as read, so they don't all count as unread."""
+    conn.execute(text("UPDATE notifications SET read_at = created_at WHERE read_at IS NULL"))
+
+
+def _seed_notification_counters(conn: Connection) -> None:
+    """Count unread in-app notifications into ``notification_counters`` when it is empty."""
+    if conn.execute(text("SELECT 1 FROM notification_counters LIMIT 1")).first():
+        return
+    result = conn.execute(
+        text(
+            "INSERT INTO notification_counters (user_id, unread) "
+            "SELECT user_id, COUNT(*) FROM notifications "
+            "WHERE channel = 'inapp' AND read_at IS NULL GROUP BY user_id"
+        )
+    )
+    if result.rowcount:
+        logger.info("Seeded unread counters for %s users", result.rowcount)
+
+
+def _move_events_to_table(conn: Connection) -> None:
+    """Move legacy ``events_json`` timelines into ``request_events`` rows.
+
+    Events without a timestamp are dated at the request's creation; events that
+    cannot be converted are logged and skipped so one bad row never blocks startup.
+    """
+    rows = conn.execute(
+        text(
+            "SELECT id, events_json, created_at FROM pickup_requests "
+            "WHERE events_json IS NOT NULL AND events_json NOT IN ('', '[]')"
+        )
+    ).all()
+    events = []
+    for request_id, raw, created_at in rows:
+        try:
+            parsed = json.loads(raw)
+        except ValueError:
+            logger.warning("Skipping unparsable events on request %s", request_id)
+            continue
+        for event in parsed:
+            try:
+                events.append(
+                    {
+                        "request_id": request_id,
+                        "type": event.get("type", "NOTE"),
+                        "at": to_naive_utc(event.get("at") or created_at),
+                        "by": event.get("by", "system"),
+                        "data": json.dumps(event["data"]) if event.get("data") is not None else None,
+                    }
+                )
+            except (AttributeError, TypeError, ValueError):
+                logger.warning("Skipping unparsable event on request %s: %r", request_id, event)
+    if events:
+        conn.execute(
+            text(
+                "INSERT INTO request_events (request_id, type, at, \"by\", data_json) "
+                "VALUES (:request_id, :type, :at, :by, :data)"
+            ),
+            events,
+        )
+    if rows:
+        conn.execute(
+            text("UPDATE pickup_requests SET events_json = '[]' WHERE id IN :ids").bindparams(
+                bindparam("ids", expanding=True)
+            ),
+            {"ids": [row[0] for row in rows]},
+        )
+        logger.info("Moved %s events from %s requests into request_events", len(events), len(rows))
+
+
+# (table, column, DDL type, backfill run once after the column is added)
+COLUMN_MIGRATIONS: list[tuple[str, str, str, Callable[[Connection], None] | None]] = [
+    ("pickup_requests", "slot_start", "DATETIME", None),
+    ("pickup_requests", "slot_end", "DATETIME", _backfill_slot_columns),
+    ("pickup_requests", "city", "VARCHAR(100) COLLATE NOCASE", None),
+    ("pickup_requests", "pincode", "VARCHAR(16)", _backfill_address_columns),
+    ("notifications", "claimed_by", "VARCHAR(64)", None),
+    ("notifications", "lease_until", "DATETIME", None),
+    ("notifications", "deliver_after", "DATETIME", None),
+    ("notifications", "read_at", "DATETIME", _mark_existing_notifications_read),
+    ("users", "email_digest", "BOOLEAN NOT NULL DEFAULT 0", None),
+]
+
+# Idempotent data steps run on every startup, after columns exist
+DATA_MIGRATIONS: list[Callable[[Connection], None]] = [
+    _rebuild_slot_capacity,
+    _move_events_to_table,
+    _seed_notification_counters,
+]
+
+
+def run_migrations(conn: Connection) -> None:
+    """Add missing columns, run their backfills and data steps (sync, via ``run_sync``).
+
+    Indexes are created afterwards by :func:`app.db.indexes.ensure_indexes`.
+    """
+    inspector = inspect(conn)
+    tables = set(inspector.get_table_names())
+    columns = {table: {col["name"] for col in inspector.get_columns(table)} for table in tables}
+
+    for table, column, ddl, backfill in COLUMN_MIGRATIONS:
+        if table not in tables or column in columns[table]:
+            continue
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+        columns[table].add(column)
+        logger.info("Added column %s.%s", table, column)
+        if backfill:
+            backfill(conn)
+
+    for step in DATA_MIGRATIONS:
+        step(conn)
@@ -0,0 +1,58 @@
+"""Unit of work: one transaction and one commit per service operation."""
+import inspect
+import logging
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+AfterCommit = Callable[[], Awaitable[Any] | Any]
+
+_DEPTH_KEY = "uow_depth"
+_CALLBACKS_KEY = "uow_after_commit"
+
+
+class UnitOfWork:
+    """Wrap a service operation so it commits exactly once.
+
+    Repositories only ``add``/``flush``; the outermost unit of work commits on
+    success and rolls back on error. Nested units (a service calling another
+    service with the same session) join the outer transaction. Callbacks
+    registered with :meth:`after_commit` run once the data is durable, which is
+    where cache updates and pushes to clients belong.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def __aenter__(self) -> "UnitOfWork":
+        self.session.info[_DEPTH_KEY] = self.session.info.get(_DEPTH_KEY, 0) + 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        depth = self.session.info[_DEPTH_KEY] - 1
+        self.session.info[_DEPTH_KEY] = depth
+        if depth:
+            return
+        callbacks: list[AfterCommit] = self.session.info.pop(_CALLBACKS_KEY, [])
+        if exc_type is not None:
+            await self.session.rollback()
+            return
+        await self.session.commit()
+        for callback in callbacks:
+            try:
+                result = callback()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("after-commit callback failed")
+
+    def after_commit(self, callback: AfterCommit) -> None:
+        """Run ``callback`` (sync or async) after the outermost commit succeeds."""
+        after_commit(self.session, callback)
+
+
+def after_commit(session: AsyncSession, callback: AfterCommit) -> None:
+    """Register a post-commit callback on whatever unit of work owns ``session``."""
+    session.info.setdefault(_CALLBACKS_KEY, []).append(callback)
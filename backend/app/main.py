@@ -10,6 +10,9 @@ from .core.logging import configure_logging
 from .core.rate_limit import rate_limit_middleware
 from .db.engine import close_db, init_db
 from .routers import auth, files, health, notifications, requests, rewards, slots, ws
+from .services.broker import broker
+from .services.email import smtp_pool
+from .services.notification import notification_dispatcher, push_fanout
 from .workers.scheduler import init_scheduler
 
 configure_logging()
@@ -17,6 +20,8 @@ settings = get_settings()
 os.makedirs(settings.upload_dir, exist_ok=True)
 
 app = FastAPI(title="SWMRA API", version="0.1.0")
+# Registered first so CORS wraps it and 429s stay readable cross-origin
+app.middleware("http")(rate_limit_middleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
@@ -24,7 +29,6 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-app.middleware("http")(rate_limit_middleware)
 
 app.include_router(health.router)
 app.include_router(auth.router)
@@ -39,12 +43,18 @@ app.include_router(ws.router)
 
 @app.on_event("startup")
 async def startup_event() -> None:
-    """Initialize database and scheduler on startup."""
+    """Initialize database, notification dispatcher and scheduler on startup."""
     await init_db()
+    await broker.start()
+    notification_dispatcher.start()
     init_scheduler()
 
 
 @app.on_event("shutdown")
 async def shutdown_event() -> None:
-    """Close database connections on shutdown."""
+    """Stop the dispatcher and close database and SMTP connections on shutdown."""
+    await notification_dispatcher.stop()
+    await push_fanout.stop()
+    await broker.stop()
+    await smtp_pool.close()
     await close_db()
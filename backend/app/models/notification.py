@@ -2,7 +2,7 @@ import json
 from datetime import datetime
 from typing import Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from sqlalchemy import Column, DateTime, Text
 from sqlmodel import Field as SQLField, SQLModel
 
@@ -26,11 +26,54 @@ class NotificationPublic(BaseModel):
     title: str
     body: str
     meta: Optional[dict] = None
-    status: Literal["queued", "sent", "failed"] = "queued"
+    status: Literal["queued", "sending", "sent", "failed"] = "queued"
     sent_at: Optional[datetime] = None
+    read_at: Optional[datetime] = None
     created_at: datetime
 
 
+class NotificationPage(BaseModel):
+    """A page of the notification inbox, newest first."""
+
+    items: list[NotificationPublic]
+    next_cursor: Optional[str] = None
+
+
+class MarkReadPayload(BaseModel):
+    """Mark every in-app notification with ``id <= up_to_id`` as read."""
+
+    up_to_id: int = Field(ge=0)
+
+
+class UnreadCount(BaseModel):
+    """Unread in-app notifications for the current user."""
+
+    unread: int
+
+
+class BroadcastCreate(BaseModel):
+    """Schema for announcing to everyone with a pickup request in a city and/or pincode."""
+
+    title: str = Field(min_length=1, max_length=255)
+    body: str = Field(min_length=1)
+    city: Optional[str] = None
+    pincode: Optional[str] = None
+    channels: list[Literal["inapp", "email"]] = Field(default=["inapp"], min_length=1)
+
+    @model_validator(mode="after")
+    def require_area(self) -> "BroadcastCreate":
+        if not (self.city or self.pincode):
+            raise ValueError("city or pincode is required")
+        return self
+
+
+class BroadcastResult(BaseModel):
+    """Outcome of queuing a broadcast."""
+
+    recipients: int
+    queued: int
+
+
 class NotificationDB(SQLModel, table=True):
     """Notification database model (SQLModel table)."""
 
@@ -43,12 +86,19 @@ class NotificationDB(SQLModel, table=True):
     body: str = SQLField(sa_column=Column(Text))
     meta_json: str = SQLField(sa_column=Column(Text, default="{}"))  # JSON object as string
     status: str = SQLField(max_length=50, default="queued")
+    # Dispatcher claim: owner of the batch and when an unfinished claim may be taken over
+    claimed_by: Optional[str] = SQLField(default=None, max_length=64)
+    lease_until: Optional[datetime] = SQLField(sa_column=Column(DateTime, nullable=True, default=None))
+    # Digest window: held back until then so later emails to the same user can be merged
+    deliver_after: Optional[datetime] = SQLField(sa_column=Column(DateTime, nullable=True, default=None))
     sent_at: Optional[datetime] = SQLField(sa_column=Column(DateTime, nullable=True, default=None))
+    # In-app read state; unread rows are counted in notification_counters
+    read_at: Optional[datetime] = SQLField(sa_column=Column(DateTime, nullable=True, default=None))
     created_at: datetime = SQLField(sa_column=Column(DateTime, nullable=False, default=datetime.utcnow))
 
     def to_public(self) -> NotificationPublic:
         """Convert DB model to public schema."""
-        return NotificationPublic(
+        return NotificationPublic.model_construct(
             id=self.id,
             user_id=self.user_id,
             channel=self.channel,
@@ -57,5 +107,15 @@ class NotificationDB(SQLModel, table=True):
             meta=json.loads(self.meta_json) if self.meta_json else {},
             status=self.status,
             sent_at=self.sent_at,
+            read_at=self.read_at,
             created_at=self.created_at,
         )
+
+
+class NotificationCounterDB(SQLModel, table=True):
+    """Unread in-app notifications per user, maintained on insert and mark-read (SQLModel table)."""
+
+    __tablename__ = "notification_counters"
+
+    user_id: int = SQLField(foreign_key="users.id", primary_key=True)
+    unread: int = SQLField(default=0)
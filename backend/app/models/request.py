@@ -50,6 +50,13 @@ class RequestEvent(BaseModel):
     data: Optional[dict[str, Any]] = None
 
 
+class RequestEventPage(BaseModel):
+    """A page of a request's timeline, oldest first."""
+
+    items: list[RequestEvent]
+    next_after: Optional[int] = None
+
+
 class PickupRequestCreate(BaseModel):
     """Schema for creating a pickup request."""
 
@@ -83,6 +90,30 @@ class PickupRequestPublic(BaseModel):
     updated_at: datetime
 
 
+class PickupRequestSummary(BaseModel):
+    """Lightweight pickup request projection for list views (no JSON columns, no timeline)."""
+
+    id: int
+    category: str
+    is_special: bool = False
+    description: str
+    status: RequestStatus = "draft"
+    assigned_slot: Optional[SlotWindow] = None
+    reward_points: int = 0
+    created_at: datetime
+    updated_at: datetime
+
+
+class PickupRequestList(BaseModel):
+    """Page of pickup requests (full or summary items)."""
+
+    items: list[PickupRequestPublic] | list[PickupRequestSummary]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    skip: int = 0
+    limit: int
+
+
 class SlotConfirmation(BaseModel):
     """Schema for confirming a time slot."""
 
@@ -97,6 +128,9 @@ class RequestFilterParams(BaseModel):
     category: Optional[str] = None
     skip: int = 0
     limit: int = 20
+    cursor: Optional[str] = None
+    include_total: bool = False
+    fields: Literal["full", "summary"] = "full"
 
 
 class CancelRequestPayload(BaseModel):
@@ -120,18 +154,29 @@ class PickupRequestDB(SQLModel, table=True):
     address_json: str = SQLField(sa_column=Column(Text))  # JSON object as string
     preferred_slots_json: str = SQLField(sa_column=Column(Text, default="[]"))  # JSON array
     assigned_slot_json: Optional[str] = SQLField(sa_column=Column(Text, nullable=True, default=None))  # JSON object
+    # Typed copy of the assigned slot (naive UTC) so bookings can be range-queried
+    slot_start: Optional[datetime] = SQLField(sa_column=Column(DateTime, nullable=True, default=None, index=True))
+    slot_end: Optional[datetime] = SQLField(sa_column=Column(DateTime, nullable=True, default=None))
+    # Typed copy of the address area so requesters can be targeted by city or pincode
+    city: Optional[str] = SQLField(
+        sa_column=Column(String(100, collation="NOCASE"), nullable=True, default=None)
+    )
+    pincode: Optional[str] = SQLField(sa_column=Column(String(16), nullable=True, default=None))
     vendor_id: Optional[int] = SQLField(default=None, foreign_key="users.id")
     status: str = SQLField(max_length=50, default="draft", index=True)
-    events_json: str = SQLField(sa_column=Column(Text, default="[]"))  # JSON array
+    events_json: str = SQLField(sa_column=Column(Text, default="[]"))  # Legacy JSON array, moved to request_events
     reward_points: int = SQLField(default=0)
     created_at: datetime = SQLField(sa_column=Column(DateTime, nullable=False, default=datetime.utcnow))
     updated_at: datetime = SQLField(
         sa_column=Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     )
 
-    def to_public(self) -> PickupRequestPublic:
-        """Convert DB model to public schema."""
-        return PickupRequestPublic(
+    def to_public(self, events: list[RequestEvent] | None = None) -> PickupRequestPublic:
+        """Convert DB model to public schema; the timeline is only included when loaded by the caller.
+
+        Stored data was validated on write, so models are built without re-validation.
+        """
+        return PickupRequestPublic.model_construct(
             id=self.id,
             user_id=self.user_id,
             category=self.category,
@@ -139,17 +184,80 @@ class PickupRequestDB(SQLModel, table=True):
             description=self.description,
             quantity=self.quantity,
             photos=json.loads(self.photos_json) if self.photos_json else [],
-            address=Address(**json.loads(self.address_json)) if self.address_json else None,
+            address=Address.model_construct(**json.loads(self.address_json)) if self.address_json else None,
             preferred_slots=[
-                SlotWindow(**slot) for slot in json.loads(self.preferred_slots_json)
+                _slot_window(slot) for slot in json.loads(self.preferred_slots_json)
             ] if self.preferred_slots_json else [],
-            assigned_slot=SlotWindow(**json.loads(self.assigned_slot_json)) if self.assigned_slot_json else None,
+            assigned_slot=_slot_window(json.loads(self.assigned_slot_json)) if self.assigned_slot_json else None,
             vendor_id=self.vendor_id,
             status=self.status,
-            events=[
-                RequestEvent(**event) for event in json.loads(self.events_json)
-            ] if self.events_json else [],
+            events=events or [],
             reward_points=self.reward_points,
             created_at=self.created_at,
             updated_at=self.updated_at,
         )
+
+
+def _slot_window(slot: dict) -> SlotWindow:
+    return SlotWindow.model_construct(
+        start=datetime.fromisoformat(slot["start"]), end=datetime.fromisoformat(slot["end"])
+    )
+
+
+# Columns read for PickupRequestSummary; everything else stays on disk
+SUMMARY_COLUMNS = (
+    PickupRequestDB.id,
+    PickupRequestDB.category,
+    PickupRequestDB.is_special,
+    PickupRequestDB.description,
+    PickupRequestDB.status,
+    PickupRequestDB.slot_start,
+    PickupRequestDB.slot_end,
+    PickupRequestDB.reward_points,
+    PickupRequestDB.created_at,
+    PickupRequestDB.updated_at,
+)
+
+
+def address_area(address: dict) -> dict[str, Optional[str]]:
+    """City and pincode of an address, as stored in the typed ``city``/``pincode`` columns."""
+    city = str(address.get("city") or "").strip()
+    pincode = str(address.get("pincode") or "").replace(" ", "")
+    return {"city": city or None, "pincode": pincode or None}
+
+
+def summary_from_row(row: Any) -> PickupRequestSummary:
+    """Build a summary from a row selected with ``SUMMARY_COLUMNS``."""
+    return PickupRequestSummary.model_construct(
+        id=row.id,
+        category=row.category,
+        is_special=row.is_special,
+        description=row.description,
+        status=row.status,
+        assigned_slot=SlotWindow.model_construct(start=row.slot_start, end=row.slot_end) if row.slot_start else None,
+        reward_points=row.reward_points,
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+    )
+
+
+class RequestEventDB(SQLModel, table=True):
+    """Request timeline event database model (SQLModel table), one row per event."""
+
+    __tablename__ = "request_events"
+
+    id: Optional[int] = SQLField(default=None, primary_key=True)
+    request_id: int = SQLField(foreign_key="pickup_requests.id", index=True)
+    type: str = SQLField(max_length=50)
+    at: datetime = SQLField(sa_column=Column(DateTime, nullable=False, default=datetime.utcnow))
+    by: str = SQLField(max_length=255)
+    data_json: Optional[str] = SQLField(sa_column=Column(Text, nullable=True, default=None))  # JSON object
+
+    def to_public(self) -> RequestEvent:
+        """Convert DB model to public schema."""
+        return RequestEvent.model_construct(
+            type=self.type,
+            at=self.at,
+            by=self.by,
+            data=json.loads(self.data_json) if self.data_json else None,
+        )
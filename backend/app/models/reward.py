@@ -44,7 +44,7 @@ class RewardDB(SQLModel, table=True):
 
     def to_public(self) -> RewardPublic:
         """Convert DB model to public schema."""
-        return RewardPublic(
+        return RewardPublic.model_construct(
             id=self.id,
             user_id=self.user_id,
             points=self.points,
@@ -0,0 +1,15 @@
+from datetime import date
+
+from sqlmodel import Field as SQLField
+from sqlmodel import SQLModel
+
+
+class SlotCapacityDB(SQLModel, table=True):
+    """Booked-slot counter per (day, hour, category class) (SQLModel table)."""
+
+    __tablename__ = "slot_capacity"
+
+    day: date = SQLField(primary_key=True)
+    hour: int = SQLField(primary_key=True)
+    category_class: str = SQLField(primary_key=True, max_length=20)
+    booked: int = SQLField(default=0)
@@ -29,6 +29,13 @@ class UserPublic(BaseModel):
     email: EmailStr
     phone: Optional[str] = None
     role: str = "citizen"
+    email_digest: bool = False
+
+
+class UserPreferences(BaseModel):
+    """Notification preferences a user can change."""
+
+    email_digest: bool
 
 
 class TokenResponse(BaseModel):
@@ -50,6 +57,8 @@ class UserDB(SQLModel, table=True):
     phone: Optional[str] = SQLField(max_length=50, default=None)
     password_hash: str = SQLField(max_length=255)
     role: str = SQLField(max_length=50, default="citizen")
+    # Opt-in to merging emails sent close together into one digest; off by default so emails go out at once
+    email_digest: bool = SQLField(default=False, sa_column_kwargs={"server_default": "0", "nullable": False})
     created_at: datetime = SQLField(
         sa_column=Column(DateTime, nullable=False, default=datetime.utcnow)
     )
@@ -65,4 +74,5 @@ class UserDB(SQLModel, table=True):
             email=self.email,
             phone=self.phone,
             role=self.role,
+            email_digest=self.email_digest,
         )
@@ -1,54 +1,246 @@
 """Notification repository using SQLModel."""
 import json
+from collections import Counter
 from datetime import datetime
-from typing import Optional
+from typing import Iterable, Optional
 
+from sqlalchemy import case, func, insert, or_, tuple_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlmodel import col, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..models.notification import NotificationDB
+from ..models.notification import NotificationCounterDB, NotificationDB
 
 
 class NotificationRepository:
-    """Repository for notification operations."""
+    """Repository for notification operations.
+
+    Every insert of in-app rows also bumps the recipients' ``notification_counters``
+    in the same transaction, so the unread count is a primary-key read.
+    """
 
     async def queue(self, session: AsyncSession, data: dict) -> NotificationDB:
         """Queue a new notification."""
-        # Convert meta dict to JSON string
-        if "meta" in data:
-            data["meta_json"] = json.dumps(data.pop("meta"))
+        return (await self.queue_many(session, [data]))[0]
+
+    async def queue_many(self, session: AsyncSession, rows: list[dict]) -> list[NotificationDB]:
+        """Insert several notifications with one multi-row INSERT."""
+        values = []
+        for data in rows:
+            data = dict(data)
+            # Convert meta dict to JSON string
+            data["meta_json"] = json.dumps(data.pop("meta", None) or {})
+            data.setdefault("status", "queued")
+            data.setdefault("sent_at", None)
+            data.setdefault("deliver_after", None)
+            data.setdefault("created_at", datetime.utcnow())
+            values.append(data)
+        statement = insert(NotificationDB).values(values).returning(NotificationDB)
+        result = await session.exec(statement)
+        # RETURNING order is unspecified; ids are assigned in VALUES order
+        created = sorted(result.scalars().all(), key=lambda notification: notification.id)
+        await self._add_unread(session, [n.user_id for n in created if n.channel == "inapp"])
+        return created
+
+    async def insert_bulk(
+        self, session: AsyncSession, rows: list[dict], batch_size: int = 1000
+    ) -> list[tuple[int, int, str]]:
+        """Insert prepared rows (``meta_json`` already encoded) as executemany statements of ``batch_size``.
+
+        Returns ``(id, user_id, channel)`` per row rather than ORM objects, so large
+        broadcasts never build an object per recipient. Parameters are processed in
+        Python on the event loop, hence the batches: the loop runs between them.
+        """
+        table = NotificationDB.__table__
+        # Core insert: the ORM bulk path would emit and splice one RETURNING statement per row
+        statement = insert(table).returning(table.c.id, table.c.user_id, table.c.channel)
+        created: list[tuple[int, int, str]] = []
+        for start in range(0, len(rows), batch_size):
+            result = await session.exec(statement, params=rows[start:start + batch_size])
+            created.extend(tuple(row) for row in result.all())
+        await self._add_unread(session, [user_id for _, user_id, channel in created if channel == "inapp"])
+        return created
 
-        data.setdefault("status", "queued")
-        notification = NotificationDB(**data)
-        session.add(notification)
-        await session.commit()
-        await session.refresh(notification)
-        return notification
+    async def _add_unread(self, session: AsyncSession, user_ids: list[int]) -> None:
+        """Add one unread notification per occurrence of a user id."""
+        if not user_ids:
+            return
+        table = NotificationCounterDB.__table__
+        statement = sqlite_insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.user_id], set_={"unread": table.c.unread + statement.excluded.unread}
+        )
+        await session.exec(
+            statement, params=[{"user_id": user_id, "unread": count} for user_id, count in Counter(user_ids).items()]
+        )
+
+    async def unread_count(self, session: AsyncSession, user_id: int) -> int:
+        """Unread in-app notifications for a user, from the maintained counter."""
+        result = await session.exec(
+            select(NotificationCounterDB.unread).where(NotificationCounterDB.user_id == user_id)
+        )
+        return result.first() or 0
 
-    async def find_queued(self, session: AsyncSession, limit: int = 50) -> list[NotificationDB]:
-        """Find queued notifications."""
-        statement = select(NotificationDB).where(NotificationDB.status == "queued").limit(limit)
+    async def mark_read(self, session: AsyncSession, user_id: int, up_to_id: int, now: datetime) -> int:
+        """Mark a user's unread in-app notifications with ``id <= up_to_id`` as read; return the new unread count.
+
+        The counter is decremented by the number of rows just marked, in the same
+        UPSERT that reads it back, so the cost does not grow with the inbox.
+        """
+        marked = await session.exec(
+            update(NotificationDB)
+            .where(
+                NotificationDB.user_id == user_id,
+                NotificationDB.channel == "inapp",
+                col(NotificationDB.read_at).is_(None),
+                col(NotificationDB.id) <= up_to_id,
+            )
+            .values(read_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        table = NotificationCounterDB.__table__
+        statement = sqlite_insert(table).values(user_id=user_id, unread=0)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.user_id], set_={"unread": func.max(table.c.unread - marked.rowcount, 0)}
+        ).returning(table.c.unread)
+        return (await session.exec(statement)).scalar_one()
+
+    async def release_expired(self, session: AsyncSession, now: datetime) -> int:
+        """Return claims whose lease ran out (crashed or stuck dispatcher) to the queue."""
+        statement = (
+            update(NotificationDB)
+            .where(NotificationDB.status == "sending", NotificationDB.lease_until < now)
+            .values(status="queued", claimed_by=None, lease_until=None)
+        )
+        result = await session.exec(statement)
+        return result.rowcount
+
+    async def claim_batch(
+        self,
+        session: AsyncSession,
+        *,
+        owner: str,
+        lease_until: datetime,
+        limit: int = 100,
+        now: datetime | None = None,
+    ) -> list[NotificationDB]:
+        """Atomically move up to ``limit`` oldest due queued notifications to ``sending`` for ``owner``."""
+        now = now or datetime.utcnow()
+        oldest = (
+            select(NotificationDB.id)
+            .where(
+                NotificationDB.status == "queued",
+                or_(col(NotificationDB.deliver_after).is_(None), col(NotificationDB.deliver_after) <= now),
+            )
+            .order_by(col(NotificationDB.created_at))
+            .limit(limit)
+        )
+        await session.exec(
+            update(NotificationDB)
+            .where(col(NotificationDB.id).in_(oldest.scalar_subquery()), NotificationDB.status == "queued")
+            .values(status="sending", claimed_by=owner, lease_until=lease_until)
+            .execution_options(synchronize_session=False)
+        )
+        statement = (
+            select(NotificationDB)
+            .where(NotificationDB.status == "sending", NotificationDB.claimed_by == owner)
+            .execution_options(populate_existing=True)
+        )
         result = await session.exec(statement)
         return list(result.all())
 
-    async def mark_sent(self, session: AsyncSession, notif_id: int, success: bool) -> None:
-        """Mark a notification as sent or failed."""
-        notification = await session.get(NotificationDB, notif_id)
-        if not notification:
-            return
+    async def open_digest_windows(
+        self, session: AsyncSession, user_ids: Iterable[int], now: datetime
+    ) -> dict[int, datetime]:
+        """For each user, when their currently open digest window (queued, not yet due) closes."""
+        ids = set(user_ids)
+        if not ids:
+            return {}
+        statement = (
+            select(NotificationDB.user_id, func.max(NotificationDB.deliver_after))
+            .where(
+                col(NotificationDB.user_id).in_(ids),
+                NotificationDB.status == "queued",
+                NotificationDB.channel == "email",
+                col(NotificationDB.deliver_after) > now,
+            )
+            .group_by(NotificationDB.user_id)
+        )
+        result = await session.exec(statement)
+        return dict(result.all())
 
-        notification.status = "sent" if success else "failed"
-        notification.sent_at = datetime.utcnow()
-        session.add(notification)
-        await session.commit()
+    async def next_due(self, session: AsyncSession) -> Optional[datetime]:
+        """When the earliest held-back notification becomes due, if any."""
+        statement = select(func.min(NotificationDB.deliver_after)).where(
+            NotificationDB.status == "queued", col(NotificationDB.deliver_after).is_not(None)
+        )
+        result = await session.exec(statement)
+        return result.one()
 
-    async def list_by_user(self, session: AsyncSession, user_id: int, limit: int = 50) -> list[NotificationDB]:
-        """List notifications for a user."""
+    async def complete_batch(self, session: AsyncSession, owner: str, results: dict[int, bool]) -> int:
+        """Write back a claimed batch in one UPDATE; ignores rows whose claim was taken over."""
+        if not results:
+            return 0
+        sent = [notif_id for notif_id, success in results.items() if success]
+        statement = (
+            update(NotificationDB)
+            .where(
+                col(NotificationDB.id).in_(list(results)),
+                NotificationDB.status == "sending",
+                NotificationDB.claimed_by == owner,
+            )
+            .values(
+                status=case((col(NotificationDB.id).in_(sent), "sent"), else_="failed"),
+                sent_at=case((col(NotificationDB.id).in_(sent), datetime.utcnow()), else_=None),
+                claimed_by=None,
+                lease_until=None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.exec(statement)
+        return result.rowcount
+
+    async def list_since(
+        self, session: AsyncSession, user_id: int, after_id: int, *, channel: str = "inapp", limit: int = 100
+    ) -> list[NotificationDB]:
+        """Notifications for a user with ``id > after_id``, oldest first.
+
+        Served by the ``user_id`` index, whose entries are ordered by rowid (``id``)
+        within each user, so this is a range read rather than a scan of the inbox.
+        """
         statement = (
             select(NotificationDB)
-            .where(NotificationDB.user_id == user_id)
-            .order_by(col(NotificationDB.created_at).desc())
+            .where(
+                NotificationDB.user_id == user_id,
+                col(NotificationDB.id) > after_id,
+                NotificationDB.channel == channel,
+            )
+            .order_by(col(NotificationDB.id))
             .limit(limit)
         )
         result = await session.exec(statement)
         return list(result.all())
+
+    async def list_by_user(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        limit: int = 50,
+        *,
+        channel: str = "inapp",
+        after: Optional[tuple[datetime, int]] = None,
+    ) -> list[NotificationDB]:
+        """A user's notifications on ``channel``, newest first.
+
+        ``after`` is the previous page's last ``(created_at, id)``.
+        """
+        statement = select(NotificationDB).where(NotificationDB.user_id == user_id, NotificationDB.channel == channel)
+        if after:
+            statement = statement.where(
+                tuple_(NotificationDB.created_at, NotificationDB.id) < tuple_(after[0], after[1])
+            )
+        statement = statement.order_by(
+            col(NotificationDB.created_at).desc(), col(NotificationDB.id).desc()
+        ).limit(limit)
+        result = await session.exec(statement)
+        return list(result.all())
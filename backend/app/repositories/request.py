@@ -1,12 +1,14 @@
 """Request repository using SQLModel."""
 import json
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 
+from sqlalchemy import tuple_, update
 from sqlmodel import col, delete, func, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..models.request import PickupRequestDB
+from ..models.request import SUMMARY_COLUMNS, PickupRequestDB, RequestEventDB, address_area
+from ..utils.time import to_naive_utc
 
 
 class RequestRepository:
@@ -16,48 +18,68 @@ class RequestRepository:
         """Create a new pickup request."""
         # Convert complex fields to JSON strings
         if "address" in data:
-            data["address_json"] = json.dumps(data.pop("address").model_dump() if hasattr(data["address"], "model_dump") else data["address"])
+            address = data.pop("address")
+            address = address.model_dump() if hasattr(address, "model_dump") else address
+            data["address_json"] = json.dumps(address)
+            data.update(address_area(address))
         if "preferred_slots" in data:
             slots = data.pop("preferred_slots")
             data["preferred_slots_json"] = json.dumps([s.model_dump() if hasattr(s, "model_dump") else s for s in slots])
         if "photos" in data:
             data["photos_json"] = json.dumps(data.pop("photos"))
-        if "events" in data:
-            events = data.pop("events")
-            data["events_json"] = json.dumps([e.model_dump() if hasattr(e, "model_dump") else e for e in events])
+        events = data.pop("events", [])
 
         request = PickupRequestDB(**data)
         session.add(request)
-        await session.commit()
-        await session.refresh(request)
+        await session.flush()
+        for event in events:
+            session.add(self._event_row(request.id, event.model_dump() if hasattr(event, "model_dump") else event))
         return request
 
     async def list_by_user(
-        self, session: AsyncSession, user_id: int, filters: dict, skip: int, limit: int
-    ) -> tuple[list[PickupRequestDB], int]:
-        """List requests for a user with filters."""
-        statement = select(PickupRequestDB).where(PickupRequestDB.user_id == user_id)
-
+        self,
+        session: AsyncSession,
+        user_id: int,
+        filters: dict,
+        limit: int,
+        *,
+        skip: int = 0,
+        after: Optional[tuple[datetime, int]] = None,
+        include_total: bool = False,
+        summary: bool = False,
+    ) -> tuple[list[Any], Optional[int]]:
+        """List requests for a user, newest first.
+
+        Pages by keyset when ``after`` (the ``(created_at, id)`` of the previous
+        page's last row) is given, otherwise by ``skip``. The ``COUNT(*)`` only
+        runs when ``include_total`` is set. With ``summary`` only
+        ``SUMMARY_COLUMNS`` are selected and plain rows are returned.
+        """
+        conditions = [PickupRequestDB.user_id == user_id]
         if "status" in filters:
-            statement = statement.where(PickupRequestDB.status == filters["status"])
+            conditions.append(PickupRequestDB.status == filters["status"])
         if "category" in filters:
-            statement = statement.where(PickupRequestDB.category == filters["category"])
-
-        # Get total count
-        count_statement = select(func.count()).select_from(PickupRequestDB).where(PickupRequestDB.user_id == user_id)
-        if "status" in filters:
-            count_statement = count_statement.where(PickupRequestDB.status == filters["status"])
-        if "category" in filters:
-            count_statement = count_statement.where(PickupRequestDB.category == filters["category"])
-
-        total_result = await session.exec(count_statement)
-        total = total_result.one()
-
-        # Get paginated results
-        statement = statement.order_by(col(PickupRequestDB.created_at).desc()).offset(skip).limit(limit)
+            conditions.append(PickupRequestDB.category == filters["category"])
+
+        total = None
+        if include_total:
+            count_statement = select(func.count()).select_from(PickupRequestDB).where(*conditions)
+            total_result = await session.exec(count_statement)
+            total = total_result.one()
+
+        statement = select(*SUMMARY_COLUMNS) if summary else select(PickupRequestDB)
+        statement = statement.where(*conditions)
+        if after:
+            statement = statement.where(
+                tuple_(PickupRequestDB.created_at, PickupRequestDB.id) < tuple_(after[0], after[1])
+            )
+        elif skip:
+            statement = statement.offset(skip)
+        statement = statement.order_by(
+            col(PickupRequestDB.created_at).desc(), col(PickupRequestDB.id).desc()
+        ).limit(limit)
         result = await session.exec(statement)
-        docs = result.all()
-        return list(docs), total
+        return list(result.all()), total
 
     async def get(self, session: AsyncSession, request_id: int, user_id: Optional[int] = None) -> Optional[PickupRequestDB]:
         """Get a request by ID, optionally filtered by user."""
@@ -67,8 +89,15 @@ class RequestRepository:
         result = await session.exec(statement)
         return result.first()
 
-    async def update(self, session: AsyncSession, request_id: int, payload: dict) -> Optional[PickupRequestDB]:
-        """Update a request."""
+    async def update(
+        self, session: AsyncSession, request_id: int, payload: dict, *, expected: Optional[dict] = None
+    ) -> Optional[PickupRequestDB]:
+        """Update a request.
+
+        With ``expected`` (column -> value as read by the caller) the row is only
+        written while those columns still hold those values; ``None`` is returned
+        when a concurrent change got there first.
+        """
         request = await session.get(PickupRequestDB, request_id)
         if not request:
             return None
@@ -76,7 +105,29 @@ class RequestRepository:
         # Handle JSON fields
         if "assigned_slot" in payload:
             slot = payload.pop("assigned_slot")
-            payload["assigned_slot_json"] = json.dumps(slot.model_dump() if hasattr(slot, "model_dump") else slot) if slot else None
+            slot = slot.model_dump(mode="json") if hasattr(slot, "model_dump") else slot
+            payload["assigned_slot_json"] = json.dumps(slot) if slot else None
+            payload["slot_start"] = to_naive_utc(slot["start"]) if slot else None
+            payload["slot_end"] = to_naive_utc(slot["end"]) if slot else None
+
+        if expected is not None:
+            statement = (
+                update(PickupRequestDB)
+                .where(
+                    PickupRequestDB.id == request_id,
+                    *(
+                        getattr(PickupRequestDB, key).is_not_distinct_from(value)
+                        for key, value in expected.items()
+                    ),
+                )
+                .values(**payload, updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            result = await session.exec(statement)
+            if result.rowcount == 0:
+                return None
+            await session.refresh(request)
+            return request
 
         # Update fields
         for key, value in payload.items():
@@ -84,25 +135,32 @@ class RequestRepository:
 
         request.updated_at = datetime.utcnow()
         session.add(request)
-        await session.commit()
-        await session.refresh(request)
         return request
 
-    async def append_event(self, session: AsyncSession, request_id: int, event: dict) -> None:
-        """Append an event to a request."""
-        request = await session.get(PickupRequestDB, request_id)
-        if not request:
-            return
+    @staticmethod
+    def _event_row(request_id: int, event: dict) -> RequestEventDB:
+        return RequestEventDB(
+            request_id=request_id,
+            type=event["type"],
+            at=to_naive_utc(event.get("at")) or datetime.utcnow(),
+            by=event["by"],
+            data_json=json.dumps(event["data"]) if event.get("data") is not None else None,
+        )
 
-        events = json.loads(request.events_json) if request.events_json else []
-        # Serialize datetime objects
-        if "at" in event and isinstance(event["at"], datetime):
-            event["at"] = event["at"].isoformat()
-        events.append(event)
-        request.events_json = json.dumps(events)
-        request.updated_at = datetime.utcnow()
-        session.add(request)
-        await session.commit()
+    async def append_event(self, session: AsyncSession, request_id: int, event: dict) -> None:
+        """Append an event to a request's timeline (a single INSERT)."""
+        session.add(self._event_row(request_id, event))
+
+    async def list_events(
+        self, session: AsyncSession, request_id: int, *, after_id: Optional[int] = None, limit: int = 50
+    ) -> list[RequestEventDB]:
+        """List a request's events in order, starting after ``after_id``."""
+        statement = select(RequestEventDB).where(RequestEventDB.request_id == request_id)
+        if after_id:
+            statement = statement.where(RequestEventDB.id > after_id)
+        statement = statement.order_by(col(RequestEventDB.id)).limit(limit)
+        result = await session.exec(statement)
+        return list(result.all())
 
     async def mark_reward(self, session: AsyncSession, request_id: int, points: int) -> None:
         """Mark reward points for a request."""
@@ -113,36 +171,36 @@ class RequestRepository:
         request.reward_points += points
         request.updated_at = datetime.utcnow()
         session.add(request)
-        await session.commit()
-
-    async def find_conflicting_slots(self, session: AsyncSession, day_start: datetime, day_end: datetime) -> list[PickupRequestDB]:
-        """Find requests with assigned slots in a given time range."""
-        # Note: Since assigned_slot is JSON, we can't do efficient date range queries
-        # We'll fetch all scheduled requests and filter in Python
-        statement = select(PickupRequestDB).where(
-            PickupRequestDB.status.notin_(["cancelled", "failed"]),
-            PickupRequestDB.assigned_slot_json.isnot(None)
-        )
-        result = await session.exec(statement)
-        requests = result.all()
-
-        # Filter by date range in Python
-        filtered = []
-        for req in requests:
-            if req.assigned_slot_json:
-                slot = json.loads(req.assigned_slot_json)
-                slot_start = datetime.fromisoformat(slot["start"]) if isinstance(slot["start"], str) else slot["start"]
-                if day_start <= slot_start < day_end:
-                    filtered.append(req)
 
-        return filtered
+    async def requester_ids(
+        self,
+        session: AsyncSession,
+        *,
+        city: Optional[str] = None,
+        pincode: Optional[str] = None,
+        after_id: int = 0,
+        limit: int = 1000,
+    ) -> list[int]:
+        """Next page of distinct ids (``> after_id``) of users with a request in ``city`` and/or ``pincode``.
+
+        The city comparison is case-insensitive. Pages are index range reads, so
+        walking a whole city costs the same per page at any depth.
+        """
+        statement = select(PickupRequestDB.user_id).distinct().where(PickupRequestDB.user_id > after_id)
+        if pincode is not None:
+            statement = statement.where(PickupRequestDB.pincode == pincode)
+        if city is not None:
+            statement = statement.where(PickupRequestDB.city == city)
+        result = await session.exec(statement.order_by(col(PickupRequestDB.user_id)).limit(limit))
+        return list(result.all())
 
     async def cleanup_drafts(self, session: AsyncSession, older_than: datetime) -> int:
         """Delete draft requests older than a given date."""
-        statement = delete(PickupRequestDB).where(
+        stale = select(PickupRequestDB.id).where(
             PickupRequestDB.status == "draft",
             PickupRequestDB.created_at < older_than
         )
+        await session.exec(delete(RequestEventDB).where(col(RequestEventDB.request_id).in_(stale)))
+        statement = delete(PickupRequestDB).where(col(PickupRequestDB.id).in_(stale))
         result = await session.exec(statement)
-        await session.commit()
         return result.rowcount
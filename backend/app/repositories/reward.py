@@ -12,8 +12,6 @@ class RewardRepository:
         """Grant a new reward."""
         reward = RewardDB(**data)
         session.add(reward)
-        await session.commit()
-        await session.refresh(reward)
         return reward
 
     async def list_recent(self, session: AsyncSession, user_id: int, limit: int = 10) -> list[RewardDB]:
@@ -0,0 +1,79 @@
+"""Slot capacity ledger repository using SQLModel."""
+from datetime import date
+
+from sqlalchemy import func, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..models.slot import SlotCapacityDB
+
+
+class SlotCapacityRepository:
+    """Repository for per-(day, hour, category class) booking counters.
+
+    Methods do not commit: reservations must land in the same transaction as the
+    request update that uses them.
+    """
+
+    async def reserve(
+        self,
+        session: AsyncSession,
+        *,
+        day: date,
+        hour: int,
+        category_class: str,
+        hour_capacity: int,
+        day_capacity: int,
+    ) -> bool:
+        """Atomically take one unit of capacity; return False when the slot or day is full."""
+        await session.exec(
+            insert(SlotCapacityDB)
+            .values(day=day, hour=hour, category_class=category_class, booked=0)
+            .on_conflict_do_nothing()
+        )
+        day_booked = (
+            select(func.coalesce(func.sum(SlotCapacityDB.booked), 0))
+            .where(SlotCapacityDB.day == day, SlotCapacityDB.category_class == category_class)
+            .scalar_subquery()
+        )
+        statement = (
+            update(SlotCapacityDB)
+            .where(
+                SlotCapacityDB.day == day,
+                SlotCapacityDB.hour == hour,
+                SlotCapacityDB.category_class == category_class,
+                SlotCapacityDB.booked < hour_capacity,
+                day_booked < day_capacity,
+            )
+            .values(booked=SlotCapacityDB.booked + 1)
+        )
+        result = await session.exec(statement)
+        return result.rowcount == 1
+
+    async def release(self, session: AsyncSession, *, day: date, hour: int, category_class: str) -> None:
+        """Give back one unit of capacity."""
+        statement = (
+            update(SlotCapacityDB)
+            .where(
+                SlotCapacityDB.day == day,
+                SlotCapacityDB.hour == hour,
+                SlotCapacityDB.category_class == category_class,
+                SlotCapacityDB.booked > 0,
+            )
+            .values(booked=SlotCapacityDB.booked - 1)
+        )
+        await session.exec(statement)
+
+    async def list_booked(
+        self, session: AsyncSession, *, day_from: date, day_to: date, category_class: str
+    ) -> list[SlotCapacityDB]:
+        """List counters with bookings for days in ``[day_from, day_to]``."""
+        statement = select(SlotCapacityDB).where(
+            SlotCapacityDB.category_class == category_class,
+            SlotCapacityDB.day >= day_from,
+            SlotCapacityDB.day <= day_to,
+            SlotCapacityDB.booked > 0,
+        )
+        result = await session.exec(statement)
+        return list(result.all())
@@ -1,9 +1,11 @@
 """User repository using SQLModel."""
-from typing import Optional
+from typing import Iterable, Optional
 
-from sqlmodel import select
+from sqlmodel import col, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from ..core.principal import invalidate_principal
+from ..db.uow import after_commit
 from ..models.user import UserDB
 
 
@@ -14,8 +16,7 @@ class UserRepository:
         """Create a new user."""
         user = UserDB(**data)
         session.add(user)
-        await session.commit()
-        await session.refresh(user)
+        await session.flush()
         return user
 
     async def get_by_email(self, session: AsyncSession, email: str) -> Optional[UserDB]:
@@ -27,3 +28,34 @@ class UserRepository:
     async def get_by_id(self, session: AsyncSession, user_id: int) -> Optional[UserDB]:
         """Get user by ID."""
         return await session.get(UserDB, user_id)
+
+    async def get_emails(self, session: AsyncSession, user_ids: Iterable[int]) -> dict[int, str]:
+        """Map user id to email for many users in one query."""
+        ids = set(user_ids)
+        if not ids:
+            return {}
+        statement = select(UserDB.id, UserDB.email).where(col(UserDB.id).in_(ids))
+        result = await session.exec(statement)
+        return dict(result.all())
+
+    async def get_digest_enabled(self, session: AsyncSession, user_ids: Iterable[int]) -> set[int]:
+        """The subset of ``user_ids`` that accept email digests."""
+        ids = set(user_ids)
+        if not ids:
+            return set()
+        statement = select(UserDB.id).where(col(UserDB.id).in_(ids), col(UserDB.email_digest).is_(True))
+        result = await session.exec(statement)
+        return set(result.all())
+
+    async def update(self, session: AsyncSession, user_id: int, data: dict) -> Optional[UserDB]:
+        """Update profile or role fields and evict the cached principal."""
+        user = await session.get(UserDB, user_id)
+        if not user:
+            return None
+        for key, value in data.items():
+            setattr(user, key, value)
+        session.add(user)
+        await session.flush()
+        invalidate_principal(user_id)
+        after_commit(session, lambda: invalidate_principal(user_id))
+        return user
@@ -6,7 +6,7 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from ..core.security import get_current_user
 from ..db.engine import get_session
-from ..models.user import TokenResponse, UserCreate, UserLogin, UserPublic
+from ..models.user import TokenResponse, UserCreate, UserLogin, UserPreferences, UserPublic
 from ..services.auth import AuthService
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -40,3 +40,14 @@ async def login(
 async def me(current_user: Annotated[UserPublic, Depends(get_current_user)]):
     """Get current user profile."""
     return current_user
+
+
+@router.patch("/me/preferences", response_model=UserPublic)
+async def update_preferences(
+    payload: UserPreferences,
+    current_user: Annotated[UserPublic, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    service: Annotated[AuthService, Depends(get_auth_service)],
+):
+    """Update the current user's notification preferences."""
+    return await service.update_preferences(session, current_user.id, payload)
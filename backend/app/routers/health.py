@@ -1,8 +1,19 @@
-from fastapi import APIRouter
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+
+from ..core.metrics import metrics
+from ..core.security import require_roles
+from ..models.user import UserPublic
 
 router = APIRouter(tags=["health"])
 
 
 @router.get("/health", include_in_schema=False)
 async def health():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics(_: Annotated[UserPublic, Depends(require_roles("admin"))]):
+    return metrics.snapshot()
@@ -1,27 +1,68 @@
 """Notifications router."""
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..core.security import get_current_user
+from ..core.responses import ORJSONResponse
+from ..core.security import get_current_user, require_roles
 from ..db.engine import get_session
+from ..models.notification import (
+    BroadcastCreate,
+    BroadcastResult,
+    MarkReadPayload,
+    NotificationPage,
+    UnreadCount,
+)
 from ..models.user import UserPublic
-from ..repositories.notification import NotificationRepository
+from ..services.notification import NotificationService
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
 
-def get_notification_repository() -> NotificationRepository:
-    return NotificationRepository()
+def get_notification_service() -> NotificationService:
+    return NotificationService()
 
 
-@router.get("")
+@router.get("", response_model=NotificationPage, response_class=ORJSONResponse)
 async def list_notifications(
     current_user: Annotated[UserPublic, Depends(get_current_user)],
-    repo: Annotated[NotificationRepository, Depends(get_notification_repository)],
+    service: Annotated[NotificationService, Depends(get_notification_service)],
     session: Annotated[AsyncSession, Depends(get_session)],
+    limit: int = Query(default=50, ge=1, le=100),
+    cursor: str | None = Query(default=None),
 ):
-    """List notifications for current user."""
-    docs = await repo.list_by_user(session, current_user.id)
-    return [doc.to_public() for doc in docs]
+    """List notifications for current user, newest first."""
+    return ORJSONResponse(await service.list_inbox(session, current_user.id, limit, cursor))
+
+
+@router.get("/unread-count", response_model=UnreadCount)
+async def unread_count(
+    current_user: Annotated[UserPublic, Depends(get_current_user)],
+    service: Annotated[NotificationService, Depends(get_notification_service)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+):
+    """Unread in-app notifications for current user."""
+    return await service.unread_count(session, current_user.id)
+
+
+@router.post("/read", response_model=UnreadCount)
+async def mark_read(
+    payload: MarkReadPayload,
+    current_user: Annotated[UserPublic, Depends(get_current_user)],
+    service: Annotated[NotificationService, Depends(get_notification_service)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+):
+    """Mark in-app notifications up to an id as read."""
+    return await service.mark_read(session, current_user.id, payload.up_to_id)
+
+
+@router.post("/broadcast", response_model=BroadcastResult)
+async def broadcast_notification(
+    payload: BroadcastCreate,
+    current_user: Annotated[UserPublic, Depends(require_roles("admin"))],
+    service: Annotated[NotificationService, Depends(get_notification_service)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+):
+    """Announce to every citizen with a request in a city and/or pincode (admins only)."""
+    return await service.broadcast(session, payload, sender_id=current_user.id)
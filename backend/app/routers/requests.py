@@ -1,14 +1,18 @@
 """Requests router."""
-from typing import Annotated
+from typing import Annotated, Literal
 
 from fastapi import APIRouter, Depends, Query
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from ..core.responses import ORJSONResponse
 from ..core.security import get_current_user
 from ..db.engine import get_session
 from ..models.request import (
     CancelRequestPayload,
     PickupRequestCreate,
+    PickupRequestList,
+    PickupRequestPublic,
+    RequestEventPage,
     RequestFilterParams,
     SlotConfirmation,
 )
@@ -22,7 +26,7 @@ def get_request_service() -> RequestService:
     return RequestService()
 
 
-@router.post("", status_code=201)
+@router.post("", status_code=201, response_model=PickupRequestPublic, response_class=ORJSONResponse)
 async def create_request(
     payload: PickupRequestCreate,
     current_user: Annotated[UserPublic, Depends(get_current_user)],
@@ -30,10 +34,10 @@ async def create_request(
     session: Annotated[AsyncSession, Depends(get_session)],
 ):
     """Create a new pickup request."""
-    return await service.create(session, current_user.id, payload)
+    return ORJSONResponse(await service.create(session, current_user.id, payload), status_code=201)
 
 
-@router.get("")
+@router.get("", response_model=PickupRequestList, response_class=ORJSONResponse)
 async def list_requests(
     current_user: Annotated[UserPublic, Depends(get_current_user)],
     service: Annotated[RequestService, Depends(get_request_service)],
@@ -41,14 +45,25 @@ async def list_requests(
     status: str | None = Query(default=None),
     category: str | None = Query(default=None),
     skip: int = 0,
-    limit: int = 20,
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = Query(default=None),
+    include_total: bool = False,
+    fields: Literal["full", "summary"] = Query(default="full"),
 ):
     """List pickup requests for current user."""
-    filters = RequestFilterParams(status=status, category=category, skip=skip, limit=limit)
-    return await service.list(session, current_user.id, filters)
+    filters = RequestFilterParams(
+        status=status,
+        category=category,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total,
+        fields=fields,
+    )
+    return ORJSONResponse(await service.list(session, current_user.id, filters))
 
 
-@router.get("/{request_id}")
+@router.get("/{request_id}", response_model=PickupRequestPublic, response_class=ORJSONResponse)
 async def get_request(
     request_id: int,
     current_user: Annotated[UserPublic, Depends(get_current_user)],
@@ -56,10 +71,23 @@ async def get_request(
     session: Annotated[AsyncSession, Depends(get_session)],
 ):
     """Get a single pickup request."""
-    return await service.get(session, request_id, current_user.id)
+    return ORJSONResponse(await service.get(session, request_id, current_user.id))
 
 
-@router.post("/{request_id}/cancel")
+@router.get("/{request_id}/events", response_model=RequestEventPage, response_class=ORJSONResponse)
+async def list_request_events(
+    request_id: int,
+    current_user: Annotated[UserPublic, Depends(get_current_user)],
+    service: Annotated[RequestService, Depends(get_request_service)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    after: int | None = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=200),
+):
+    """Page through a pickup request's timeline."""
+    return ORJSONResponse(await service.events(session, request_id, current_user.id, after=after, limit=limit))
+
+
+@router.post("/{request_id}/cancel", response_model=PickupRequestPublic, response_class=ORJSONResponse)
 async def cancel_request(
     request_id: int,
     payload: CancelRequestPayload | None,
@@ -68,10 +96,10 @@ async def cancel_request(
     session: Annotated[AsyncSession, Depends(get_session)],
 ):
     """Cancel a pickup request."""
-    return await service.cancel(session, request_id, current_user.id, payload)
+    return ORJSONResponse(await service.cancel(session, request_id, current_user.id, payload))
 
 
-@router.post("/{request_id}/confirm-slot")
+@router.post("/{request_id}/confirm-slot", response_model=PickupRequestPublic, response_class=ORJSONResponse)
 async def confirm_slot(
     request_id: int,
     payload: SlotConfirmation,
@@ -80,4 +108,4 @@ async def confirm_slot(
     session: Annotated[AsyncSession, Depends(get_session)],
 ):
     """Confirm a time slot for pickup."""
-    return await service.confirm_slot(session, request_id, current_user.id, payload)
+    return ORJSONResponse(await service.confirm_slot(session, request_id, current_user.id, payload))
@@ -4,8 +4,10 @@ from typing import Annotated
 from fastapi import APIRouter, Depends
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from ..core.responses import ORJSONResponse
 from ..core.security import get_current_user
 from ..db.engine import get_session
+from ..models.reward import RewardSummary
 from ..models.user import UserPublic
 from ..services.reward import RewardService
 
@@ -16,11 +18,11 @@ def get_reward_service() -> RewardService:
     return RewardService()
 
 
-@router.get("/summary")
+@router.get("/summary", response_model=RewardSummary, response_class=ORJSONResponse)
 async def summary(
     current_user: Annotated[UserPublic, Depends(get_current_user)],
     service: Annotated[RewardService, Depends(get_reward_service)],
     session: Annotated[AsyncSession, Depends(get_session)],
 ):
     """Get reward summary for current user."""
-    return await service.summary(session, current_user.id)
+    return ORJSONResponse(await service.summary(session, current_user.id))
@@ -1,5 +1,5 @@
 """Slots router."""
-from datetime import datetime
+from datetime import date, datetime
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, Query
@@ -8,7 +8,7 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from ..core.security import get_current_user
 from ..db.engine import get_session
 from ..models.user import UserPublic
-from ..services.slot import SlotService
+from ..services.slot import MAX_AVAILABILITY_DAYS, SlotService
 
 router = APIRouter(tags=["slots"])
 
@@ -32,3 +32,23 @@ async def available_slots(
         raise HTTPException(status_code=400, detail="Invalid date format") from exc
     slots = await service.available_slots(session, date=dt, category=category)
     return slots
+
+
+@router.get("/slots/availability")
+async def availability(
+    _: Annotated[UserPublic, Depends(get_current_user)],
+    service: Annotated[SlotService, Depends(get_slot_service)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    day_from: str = Query(..., alias="from", description="YYYY-MM-DD"),
+    day_to: str = Query(..., alias="to", description="YYYY-MM-DD"),
+    category: str = Query(...),
+):
+    """Get available time slots for every day in a date range."""
+    try:
+        start = date.fromisoformat(day_from)
+        end = date.fromisoformat(day_to)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid date format") from exc
+    if end < start or (end - start).days >= MAX_AVAILABILITY_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range must span 1-{MAX_AVAILABILITY_DAYS} days")
+    return await service.availability(session, day_from=start, day_to=end, category=category)
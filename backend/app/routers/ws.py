@@ -1,21 +1,28 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from ..core.security import decode_token
+from ..services.notification import NotificationService
 from ..services.ws import manager
 
 router = APIRouter()
 
 
 @router.websocket("/ws/notifications")
-async def websocket_notifications(websocket: WebSocket, token: str):
+async def websocket_notifications(websocket: WebSocket, token: str, last_seen_id: int | None = None):
     payload = decode_token(token)
     user_id = payload.get("sub")
     if not user_id:
         await websocket.close(code=4001)
         return
-    await manager.connect(user_id, websocket)
+    backlog = None
+    if last_seen_id is not None:
+        # Resuming: replay what was missed before switching to live delivery
+        async def backlog():
+            return await NotificationService().replay(int(user_id), last_seen_id)
+
+    await manager.connect(user_id, websocket, backlog=backlog)
     try:
         while True:
-            await websocket.receive_text()  # keepalive
+            await websocket.receive_text()  # heartbeats are server-driven; this only detects close
     except WebSocketDisconnect:
-        manager.disconnect(user_id, websocket)
\ No newline at end of file
+        manager.disconnect(user_id, websocket)
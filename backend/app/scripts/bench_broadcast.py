@@ -0,0 +1,100 @@
+"""Benchmark queuing a city-wide broadcast and how responsive the event loop stays meanwhile.
+
+    python -m app.scripts.bench_broadcast [recipients] [chunk_size]
+
+Seeds ``recipients`` users with one pickup request each in a temporary SQLite
+file, then times ``NotificationService.broadcast`` for the in-app and email
+channels. A ticker task measures the worst event-loop stall during the run.
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.config import get_settings
+from ..db.indexes import ensure_indexes
+from ..db.migrations import run_migrations
+from ..models.notification import BroadcastCreate
+from ..models.request import PickupRequestDB, RequestEventDB  # noqa: F401
+from ..models.reward import RewardDB  # noqa: F401
+from ..models.slot import SlotCapacityDB  # noqa: F401
+from ..models.user import UserDB
+from ..services import notification as notification_module
+from ..services.notification import NotificationService
+
+
+async def seed(engine, recipients: int) -> None:
+    now = datetime.utcnow()
+    address = json.dumps({"line1": "1", "city": "Mumbai", "pincode": "400077"})
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(UserDB),
+            [
+                {"name": f"U{i}", "email": f"u{i}@example.com", "password_hash": "x", "role": "citizen",
+                 "created_at": now, "updated_at": now}
+                for i in range(recipients)
+            ],
+        )
+        await conn.execute(
+            insert(PickupRequestDB),
+            [
+                {"user_id": i + 1, "category": "recyclable", "description": "d", "quantity": 1,
+                 "address_json": address, "city": "Mumbai", "pincode": "400077", "status": "submitted",
+                 "created_at": now, "updated_at": now}
+                for i in range(recipients)
+            ],
+        )
+
+
+async def run(recipients: int, chunk_size: int) -> None:
+    directory = tempfile.mkdtemp()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(run_migrations)
+        await ensure_indexes(conn)
+    await seed(engine, recipients)
+
+    service = NotificationService()
+    service.settings = get_settings().model_copy(update={"notification_broadcast_chunk_size": chunk_size})
+    notification_module.push_fanout.submit = lambda template, pushes: None  # measure queuing only
+
+    stalls: list[float] = []
+
+    async def ticker() -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stalls.append(time.perf_counter() - started)
+
+    tick = asyncio.create_task(ticker())
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        started = time.perf_counter()
+        result = await service.broadcast(
+            session, BroadcastCreate(title="t", body="b", city="Mumbai", channels=["inapp", "email"]), sender_id=1
+        )
+        elapsed = time.perf_counter() - started
+    tick.cancel()
+    await engine.dispose()
+
+    print(f"{result.recipients} recipients, {result.queued} rows, chunks of {chunk_size}")
+    print(f"queued in {elapsed:.2f} s ({result.queued / elapsed:,.0f} rows/s)")
+    print(f"worst event-loop stall: {max(stalls) * 1000:.1f} ms")
+
+
+def main() -> None:
+    recipients = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else get_settings().notification_broadcast_chunk_size
+    asyncio.run(run(recipients, chunk_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark rate-limit stores: per-check overhead and cross-worker enforcement.
+
+    python -m app.scripts.bench_rate_limit [checks] [workers]
+
+Per-check cost is measured in one process over a spread of client keys. The
+worker test has every process hammer the same key within one burst window and
+counts how many checks were allowed in total: a shared store admits ``burst``,
+per-process memory stores admit ``burst x workers``.
+"""
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from ..core.rate_limit import GCRARateLimiter, MemoryRateLimitStore, SQLiteRateLimitStore
+
+BURST = 60
+
+
+def make_store(kind: str, path: str):
+    return SQLiteRateLimitStore(path) if kind == "sqlite" else MemoryRateLimitStore()
+
+
+def per_check_us(kind: str, path: str, checks: int) -> float:
+    limiter = GCRARateLimiter(rate_per_min=600_000, store=make_store(kind, path))
+    keys = [f"ip:10.0.{i // 256}.{i % 256}" for i in range(1000)]
+    started = time.perf_counter()
+    for i in range(checks):
+        limiter.hit(keys[i % len(keys)])
+    return (time.perf_counter() - started) / checks * 1e6
+
+
+def _worker(kind: str, path: str, attempts: int, results) -> None:
+    limiter = GCRARateLimiter(rate_per_min=BURST, store=make_store(kind, path))
+    results.put(sum(1 for _ in range(attempts) if limiter.hit("ip:shared") == 0))
+
+
+def allowed_across_workers(kind: str, path: str, workers: int) -> int:
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_worker, args=(kind, path, BURST * 2, results)) for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return sum(results.get() for _ in processes)
+
+
+def main() -> None:
+    checks = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind in ("memory", "sqlite"):
+            path = str(Path(tmp) / f"{kind}-overhead.db")
+            print(f"{kind:6s}  {per_check_us(kind, path, checks):7.1f} us/check", end="  ")
+            path = str(Path(tmp) / f"{kind}-workers.db")
+            allowed = allowed_across_workers(kind, path, workers)
+            print(f"{workers} workers allowed {allowed} of burst {BURST}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Microbenchmark: per-item cost of turning pickup request rows into a JSON response.
+
+    python -m app.scripts.bench_serialization [items] [events_per_item]
+
+``validated`` reproduces the previous path: validating ``to_public`` constructors
+followed by FastAPI's ``jsonable_encoder`` and ``json.dumps``. ``trusted`` is the
+current path: ``model_construct`` conversion rendered by ``ORJSONResponse``.
+"""
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+
+from ..core.responses import ORJSONResponse
+from ..models.request import (
+    Address,
+    PickupRequestDB,
+    PickupRequestPublic,
+    RequestEvent,
+    RequestEventDB,
+    SlotWindow,
+)
+
+
+def build_rows(items: int, events_per_item: int) -> list[tuple[PickupRequestDB, list[RequestEventDB]]]:
+    start = datetime(2030, 1, 10, 9)
+    slot = {"start": start.isoformat(), "end": (start + timedelta(hours=1)).isoformat()}
+    rows = []
+    for index in range(items):
+        request = PickupRequestDB(
+            id=index + 1,
+            user_id=1,
+            category="recyclable",
+            description="Old newspapers & plastic bottles",
+            quantity=3,
+            photos_json=json.dumps(["/uploads/2030/01/a.jpg", "/uploads/2030/01/b.jpg"]),
+            address_json=json.dumps({"line1": "B-102", "city": "Mumbai", "pincode": "400077", "lat": 19.07, "lng": 72.89}),
+            preferred_slots_json=json.dumps([slot, slot]),
+            assigned_slot_json=json.dumps(slot),
+            status="scheduled",
+            created_at=start,
+            updated_at=start,
+        )
+        events = [
+            RequestEventDB(
+                id=event_id, request_id=index + 1, type="STATUS_CHANGE", at=start, by="1",
+                data_json=json.dumps({"from": "submitted", "to": "scheduled"}),
+            )
+            for event_id in range(events_per_item)
+        ]
+        rows.append((request, events))
+    return rows
+
+
+def validated(rows) -> bytes:
+    items = []
+    for request, events in rows:
+        items.append(
+            PickupRequestPublic(
+                id=request.id,
+                user_id=request.user_id,
+                category=request.category,
+                is_special=request.is_special,
+                description=request.description,
+                quantity=request.quantity,
+                photos=json.loads(request.photos_json),
+                address=Address(**json.loads(request.address_json)),
+                preferred_slots=[SlotWindow(**slot) for slot in json.loads(request.preferred_slots_json)],
+                assigned_slot=SlotWindow(**json.loads(request.assigned_slot_json)),
+                status=request.status,
+                events=[
+                    RequestEvent(type=event.type, at=event.at, by=event.by, data=json.loads(event.data_json))
+                    for event in events
+                ],
+                reward_points=request.reward_points,
+                created_at=request.created_at,
+                updated_at=request.updated_at,
+            )
+        )
+    content = jsonable_encoder({"items": items, "total": len(items), "skip": 0, "limit": len(items)})
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def trusted(rows) -> bytes:
+    items = [request.to_public([event.to_public() for event in events]) for request, events in rows]
+    return ORJSONResponse({"items": items, "total": len(items), "skip": 0, "limit": len(items)}).body
+
+
+def measure(fn, rows, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - started)
+    return best / len(rows) * 1e6
+
+
+def main() -> None:
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    events_per_item = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    rows = build_rows(items, events_per_item)
+    assert json.loads(validated(rows))["items"][0]["id"] == json.loads(trusted(rows))["items"][0]["id"]
+
+    before = measure(validated, rows)
+    after = measure(trusted, rows)
+    print(f"{items} items x {events_per_item} events")
+    print(f"validated + jsonable_encoder: {before:8.1f} us/item")
+    print(f"trusted + orjson:             {after:8.1f} us/item  ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Benchmark email throughput: connection per message vs the pooled transport.
+
+    python -m app.scripts.bench_smtp [messages] [rtt_ms]
+
+Runs against an in-process SMTP stand-in that waits ``rtt_ms`` before every
+reply to approximate a network round trip (pass 0 for raw loopback), so no
+mail server is needed. Point ``SMTP_HOST``/``SMTP_PORT`` at the mailhog service
+from docker-compose to repeat the pooled run against a real server.
+"""
+import asyncio
+import smtplib
+import sys
+import time
+from email.message import EmailMessage
+
+from ..services.email import SMTPPool
+
+
+class SMTPStandIn:
+    """Just enough of an SMTP server to accept mail: EHLO, AUTH PLAIN, MAIL, RCPT, DATA, NOOP, RSET, QUIT."""
+
+    def __init__(self, *, rtt: float = 0.0, max_messages_per_connection: int | None = None) -> None:
+        self.rtt = rtt
+        self.max_messages_per_connection = max_messages_per_connection
+        self.connections = 0
+        self.messages = 0
+        self.port = 0
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> "SMTPStandIn":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _reply(self, writer: asyncio.StreamWriter, text: str) -> None:
+        if self.rtt:
+            await asyncio.sleep(self.rtt)
+        writer.write(text.encode() + b"\r\n")
+        await writer.drain()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        delivered = 0
+        await self._reply(writer, "220 stand-in ESMTP")
+        try:
+            while line := await reader.readline():
+                command = line.decode().strip().upper()
+                if command.startswith("EHLO"):
+                    await self._reply(writer, "250-stand-in\r\n250 AUTH PLAIN")
+                elif command.startswith("AUTH"):
+                    await self._reply(writer, "235 Authentication successful")
+                elif command.startswith("DATA"):
+                    await self._reply(writer, "354 End data with <CR><LF>.<CR><LF>")
+                    while (await reader.readline()) not in (b".\r\n", b""):
+                        pass
+                    self.messages += 1
+                    delivered += 1
+                    await self._reply(writer, "250 Queued")
+                    if self.max_messages_per_connection and delivered >= self.max_messages_per_connection:
+                        break
+                elif command.startswith("QUIT"):
+                    await self._reply(writer, "221 Bye")
+                    break
+                else:
+                    await self._reply(writer, "250 OK")
+        finally:
+            writer.close()
+
+
+def build_message(index: int) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = "no-reply@swmra.local"
+    message["To"] = f"citizen{index}@example.com"
+    message["Subject"] = f"Pickup scheduled #{index}"
+    message.set_content("Your pickup has been scheduled.")
+    return message
+
+
+async def connection_per_message(port: int, messages: int) -> float:
+    """The previous transport: connect, login and quit for every message, in a thread."""
+
+    def send(message: EmailMessage) -> None:
+        with smtplib.SMTP("127.0.0.1", port) as smtp:
+            smtp.login("user", "pass")
+            smtp.send_message(message)
+
+    started = time.perf_counter()
+    for index in range(messages):
+        await asyncio.to_thread(send, build_message(index))
+    return time.perf_counter() - started
+
+
+async def pooled(port: int, messages: int, size: int) -> float:
+    pool = SMTPPool(host="127.0.0.1", port=port, username="user", password="pass", size=size)
+    started = time.perf_counter()
+    await asyncio.gather(*(pool.send(build_message(index)) for index in range(messages)))
+    elapsed = time.perf_counter() - started
+    await pool.close()
+    return elapsed
+
+
+async def main() -> None:
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rtt = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.002
+    server = await SMTPStandIn(rtt=rtt).start()
+    print(f"{messages} messages, {rtt * 1000:.1f} ms simulated RTT")
+    runs = [
+        ("connection per message", connection_per_message(server.port, messages)),
+        ("pool size=1", pooled(server.port, messages, 1)),
+        ("pool size=4", pooled(server.port, messages, 4)),
+    ]
+    for label, run in runs:
+        before = server.connections
+        elapsed = await run
+        print(f"{label:24s} {messages / elapsed:8.0f} msg/s  ({server.connections - before} connections)")
+    await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
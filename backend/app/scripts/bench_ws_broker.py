@@ -0,0 +1,85 @@
+"""Benchmark end-to-end push latency through the Unix-socket broker across processes.
+
+    python -m app.scripts.bench_ws_broker [workers] [messages]
+
+``workers`` subscriber processes each hold a disjoint set of users; the parent
+publishes ``messages`` pushes to random users and every subscriber reports the
+publish-to-deliver latency of what it received (``time.monotonic`` is
+system-wide on Linux, so timestamps compare across processes).
+"""
+import asyncio
+import multiprocessing
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from ..services.broker import UnixSocketBroker
+
+USERS_PER_WORKER = 50
+
+
+def _subscriber(directory: str, index: int, expected: multiprocessing.Value, ready, results) -> None:
+    async def run() -> None:
+        latencies: list[float] = []
+        broker = UnixSocketBroker(
+            directory,
+            lambda user, payload: latencies.append(time.monotonic() - payload["t"]),
+            worker_id=f"sub{index}",
+        )
+        await broker.start()
+        for user in range(index * USERS_PER_WORKER, (index + 1) * USERS_PER_WORKER):
+            broker.subscribe(str(user))
+        await broker.flush()
+        ready.release()
+        deadline = time.monotonic() + 30
+        while (expected.value < 0 or len(latencies) < expected.value) and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        await broker.stop()
+        results.put(latencies)
+
+    asyncio.run(run())
+
+
+async def publish(directory: str, workers: int, messages: int, counts) -> None:
+    broker = UnixSocketBroker(directory, lambda user, payload: None, worker_id="publisher")
+    await broker.start()
+    sent = [0] * workers
+    for _ in range(messages):
+        user = random.randrange(workers * USERS_PER_WORKER)
+        sent[user // USERS_PER_WORKER] += 1
+        broker.publish(str(user), {"t": time.monotonic(), "title": "Pickup scheduled", "body": "x" * 120})
+        await asyncio.sleep(0.0005)
+    for index, count in enumerate(sent):
+        counts[index].value = count
+    await broker.stop()
+
+
+def main() -> None:
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    messages = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    with tempfile.TemporaryDirectory() as directory:
+        ready = multiprocessing.Semaphore(0)
+        results = multiprocessing.Queue()
+        counts = [multiprocessing.Value("i", -1) for _ in range(workers)]
+        processes = [
+            multiprocessing.Process(target=_subscriber, args=(directory, i, counts[i], ready, results))
+            for i in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        for _ in processes:
+            ready.acquire()
+        asyncio.run(publish(directory, workers, messages, counts))
+        latencies = sorted(value for _ in processes for value in results.get())
+        for process in processes:
+            process.join()
+
+    us = [value * 1e6 for value in latencies]
+    print(f"{workers} workers, {len(us)}/{messages} pushes delivered")
+    print(f"p50 {statistics.median(us):7.0f} us   p99 {us[int(len(us) * 0.99) - 1]:7.0f} us   max {us[-1]:7.0f} us")
+
+
+if __name__ == "__main__":
+    main()
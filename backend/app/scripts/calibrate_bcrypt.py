@@ -0,0 +1,46 @@
+"""Pick the bcrypt cost for a target hash latency on this machine.
+
+    python -m app.scripts.calibrate_bcrypt [target_ms]
+
+Prints the timing for each cost and the highest one that stays within the
+target; set it as ``BCRYPT_ROUNDS``. Existing hashes are upgraded on the next
+successful login.
+"""
+import sys
+import time
+
+from passlib.hash import bcrypt
+
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+
+
+def measure(rounds: int, samples: int = 3) -> float:
+    hasher = bcrypt.using(rounds=rounds)
+    best = float("inf")
+    for _ in range(samples):
+        started = time.perf_counter()
+        hasher.hash("calibration-password")
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def calibrate(target_ms: float) -> int:
+    chosen = MIN_ROUNDS
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        elapsed = measure(rounds)
+        print(f"rounds={rounds:2d}  {elapsed:8.1f} ms")
+        if elapsed > target_ms:
+            break
+        chosen = rounds
+    return chosen
+
+
+def main() -> None:
+    target_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 250
+    rounds = calibrate(target_ms)
+    print(f"BCRYPT_ROUNDS={rounds}  (target {target_ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -34,7 +34,7 @@ async def seed() -> None:
                     name=user["name"],
                     email=user["email"],
                     phone=user.get("phone"),
-                    password_hash=hash_password(user["password"]),
+                    password_hash=await hash_password(user["password"]),
                     role="citizen",
                 )
                 session.add(user_db)
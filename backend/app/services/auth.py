@@ -2,8 +2,9 @@
 from fastapi import HTTPException, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..core.security import create_access_token, hash_password, verify_password
-from ..models.user import TokenResponse, UserCreate, UserPublic
+from ..core.security import create_access_token, hash_password, verify_and_update_password
+from ..db.uow import UnitOfWork
+from ..models.user import TokenResponse, UserCreate, UserPreferences, UserPublic
 from ..repositories.user import UserRepository
 
 
@@ -20,19 +21,27 @@ class AuthService:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exists")
 
         data = payload.model_dump()
-        data["password_hash"] = hash_password(payload.password)
+        data["password_hash"] = await hash_password(payload.password)
         data.pop("password")
         data["role"] = "citizen"
 
-        user = await self.repo.create(session, data)
+        async with UnitOfWork(session):
+            user = await self.repo.create(session, data)
         token = create_access_token(str(user.id))
         return TokenResponse(access_token=token, user=user.to_public())
 
     async def login(self, session: AsyncSession, email: str, password: str) -> TokenResponse:
         """Login a user."""
         user = await self.repo.get_by_email(session, email)
-        if not user or not verify_password(password, user.password_hash):
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+        valid, new_hash = await verify_and_update_password(password, user.password_hash)
+        if not valid:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+        if new_hash:
+            # BCRYPT_ROUNDS changed since this hash was created
+            async with UnitOfWork(session):
+                await self.repo.update(session, user.id, {"password_hash": new_hash})
 
         token = create_access_token(str(user.id))
         return TokenResponse(access_token=token, user=user.to_public())
@@ -43,3 +52,11 @@ class AuthService:
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
         return user.to_public()
+
+    async def update_preferences(self, session: AsyncSession, user_id: int, payload: UserPreferences) -> UserPublic:
+        """Update notification preferences."""
+        async with UnitOfWork(session):
+            user = await self.repo.update(session, user_id, payload.model_dump())
+        if not user:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        return user.to_public()
@@ -0,0 +1,222 @@
+"""Routes in-app pushes to whichever worker process holds the user's sockets."""
+import asyncio
+import logging
+import os
+import socket
+import sqlite3
+from collections.abc import Callable, Coroutine
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import orjson
+
+from ..core.config import get_settings
+from ..core.metrics import metrics
+from ..utils.cache import TTLCache
+from .ws import manager
+
+logger = logging.getLogger(__name__)
+
+Deliver = Callable[[str, dict], None]
+# Users whose remote routes are remembered between route table reads
+ROUTE_CACHE_SIZE = 10_000
+
+
+class LocalBroker:
+    """Single-process deployments: publishing is local delivery."""
+
+    def __init__(self, deliver: Deliver) -> None:
+        self.deliver = deliver
+
+    def publish(self, user_id: str, payload: dict) -> None:
+        self.deliver(user_id, payload)
+
+    def subscribe(self, user_id: str) -> None:
+        pass
+
+    def unsubscribe(self, user_id: str) -> None:
+        pass
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class UnixSocketBroker:
+    """Multi-worker deployments on one host.
+
+    Every worker binds a Unix datagram socket in ``directory`` and records the
+    users it holds sockets for in a shared SQLite route table. ``publish``
+    delivers locally when this worker holds the user and sends one datagram to
+    each other worker listed for that user; workers that no longer exist have
+    their routes removed on the first failed send.
+
+    Route table reads and writes run on one dedicated thread, so they never block
+    the event loop and apply in call order. ``subscribe``/``unsubscribe``/``publish``
+    return immediately; a failure in the background is logged and counted as
+    ``ws.broker.errors``, never raised into the caller.
+
+    ``publish`` reads a user's remote workers from a short-lived in-memory cache,
+    so the route table is only consulted once per user per ``route_ttl_seconds``.
+    A worker that gains a user tells every other worker to drop that user's cache
+    entry, so new sockets elsewhere are reached without waiting for the TTL.
+    """
+
+    def __init__(
+        self, directory: str, deliver: Deliver, *, worker_id: str | None = None, route_ttl_seconds: float = 1
+    ) -> None:
+        self.directory = directory
+        self.deliver = deliver
+        self.worker_id = worker_id or str(os.getpid())
+        self.address = os.path.join(directory, f"ws-{self.worker_id}.sock")
+        self._held: set[str] = set()
+        self._db: sqlite3.Connection | None = None
+        self._sock: socket.socket | None = None
+        self._routes = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ws-routes")
+        self._pending: set[asyncio.Task] = set()
+        self._remote: TTLCache[list[str]] = TTLCache(
+            "ws_routes", maxsize=ROUTE_CACHE_SIZE, ttl_seconds=route_ttl_seconds
+        )
+
+    def _open_routes(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self._db = sqlite3.connect(
+            os.path.join(self.directory, "routes.db"), isolation_level=None, check_same_thread=False, timeout=1
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS ws_routes (user_id TEXT NOT NULL, worker TEXT NOT NULL,"
+            " PRIMARY KEY (user_id, worker)) WITHOUT ROWID"
+        )
+        self._db.execute("DELETE FROM ws_routes WHERE worker = ?", (self.worker_id,))
+
+    def _close_routes(self) -> None:
+        self._db.execute("DELETE FROM ws_routes WHERE worker = ?", (self.worker_id,))
+        self._db.close()
+        self._db = None
+
+    async def _execute(self, sql: str, params: tuple = ()) -> list[tuple]:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._routes, lambda: self._db.execute(sql, params).fetchall()
+        )
+
+    def _in_background(self, operation: Coroutine[Any, Any, Any]) -> None:
+        task = asyncio.get_running_loop().create_task(operation)
+        self._pending.add(task)
+        task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._pending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Push broker operation failed", exc_info=task.exception())
+            metrics.incr("ws.broker.errors")
+
+    async def flush(self) -> None:
+        """Wait until every route write and forward issued so far has finished."""
+        while self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    async def start(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(self._routes, self._open_routes)
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(self.address)
+        self._sock.setblocking(False)
+        asyncio.get_running_loop().add_reader(self._sock.fileno(), self._receive)
+
+    async def stop(self) -> None:
+        await self.flush()
+        if self._sock is not None:
+            asyncio.get_running_loop().remove_reader(self._sock.fileno())
+            self._sock.close()
+            self._sock = None
+            if os.path.exists(self.address):
+                os.unlink(self.address)
+        if self._db is not None:
+            await asyncio.get_running_loop().run_in_executor(self._routes, self._close_routes)
+        self._held.clear()
+        self._remote.clear()
+
+    def _peers(self) -> list[str]:
+        """Worker ids with a socket in ``directory``, other than this one."""
+        return [
+            name[len("ws-") : -len(".sock")]
+            for name in os.listdir(self.directory)
+            if name.startswith("ws-") and name.endswith(".sock") and name != os.path.basename(self.address)
+        ]
+
+    def subscribe(self, user_id: str) -> None:
+        self._held.add(user_id)
+        self._in_background(self._add_route(user_id))
+
+    async def _add_route(self, user_id: str) -> None:
+        await self._execute("INSERT OR IGNORE INTO ws_routes (user_id, worker) VALUES (?, ?)", (user_id, self.worker_id))
+        # Other workers may have cached that this user has no socket here
+        peers = await asyncio.get_running_loop().run_in_executor(self._routes, self._peers)
+        self._send(orjson.dumps({"i": user_id}), peers)
+
+    def unsubscribe(self, user_id: str) -> None:
+        self._held.discard(user_id)
+        self._in_background(
+            self._execute("DELETE FROM ws_routes WHERE user_id = ? AND worker = ?", (user_id, self.worker_id))
+        )
+
+    def publish(self, user_id: str, payload: dict) -> None:
+        if user_id in self._held:
+            self.deliver(user_id, payload)
+        workers = self._remote.get(user_id)
+        if workers is None:
+            self._in_background(self._forward(user_id, payload))
+        elif workers:
+            self._send(orjson.dumps({"u": user_id, "p": payload}), workers)
+
+    async def _forward(self, user_id: str, payload: dict) -> None:
+        rows = await self._execute(
+            "SELECT worker FROM ws_routes WHERE user_id = ? AND worker != ?", (user_id, self.worker_id)
+        )
+        workers = [worker for (worker,) in rows]
+        self._remote.set(user_id, workers)
+        if workers:
+            self._send(orjson.dumps({"u": user_id, "p": payload}), workers)
+
+    def _send(self, datagram: bytes, workers: list[str]) -> None:
+        for worker in workers:
+            try:
+                self._sock.sendto(datagram, os.path.join(self.directory, f"ws-{worker}.sock"))
+                metrics.incr("ws.broker.forwarded")
+            except (ConnectionRefusedError, FileNotFoundError):
+                self._remote.clear()
+                self._in_background(self._execute("DELETE FROM ws_routes WHERE worker = ?", (worker,)))
+            except OSError as exc:
+                # Full receive buffer or oversized payload: drop, the client replays on reconnect
+                logger.warning("Dropped datagram to worker %s: %s", worker, exc)
+                metrics.incr("ws.broker.dropped")
+
+    def _receive(self) -> None:
+        while True:
+            try:
+                datagram = self._sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                return
+            message = orjson.loads(datagram)
+            if "i" in message:
+                self._remote.pop(message["i"])
+            elif message["u"] in self._held:
+                self.deliver(message["u"], message["p"])
+
+
+def _settings_broker() -> LocalBroker | UnixSocketBroker:
+    settings = get_settings()
+    if settings.ws_broker == "unix":
+        return UnixSocketBroker(
+            settings.ws_broker_dir, manager.send, route_ttl_seconds=settings.ws_broker_route_ttl_seconds
+        )
+    return LocalBroker(manager.send)
+
+
+broker = _settings_broker()
+manager.on_subscribe = broker.subscribe
+manager.on_unsubscribe = broker.unsubscribe
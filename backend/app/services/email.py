@@ -0,0 +1,131 @@
+"""Pooled SMTP transport for email notifications."""
+import asyncio
+import logging
+import time
+from email.message import EmailMessage
+
+import aiosmtplib
+
+from ..core.config import get_settings
+from ..core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Errors after which a connection is discarded and the send retried on a fresh one
+RECONNECT_ERRORS = (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError, OSError)
+
+
+class _Connection:
+    def __init__(self, smtp: aiosmtplib.SMTP) -> None:
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+
+
+class SMTPPool:
+    """Up to ``size`` authenticated SMTP connections reused across messages.
+
+    Connections are opened lazily, checked with ``NOOP`` when they have been idle
+    longer than ``idle_check_seconds`` and replaced when the server drops them.
+    Each connection carries many messages, so TCP, STARTTLS and AUTH are paid once
+    per connection rather than once per email. Messages on one connection go one
+    after another without PIPELINING, which aiosmtplib does not support;
+    concurrency comes from the ``size`` connections.
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str,
+        port: int,
+        username: str | None = None,
+        password: str | None = None,
+        size: int = 4,
+        timeout: float = 10,
+        idle_check_seconds: float = 30,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.username = username or None
+        self.password = password or None
+        self.size = size
+        self.timeout = timeout
+        self.idle_check_seconds = idle_check_seconds
+        self._idle: list[_Connection] = []
+        self._slots: asyncio.Semaphore | None = None
+
+    async def send(self, message: EmailMessage) -> None:
+        """Send one message, retrying once on a fresh connection if the pooled one is dead."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        async with self._slots:
+            conn = await self._checkout()
+            try:
+                await self._send_on(conn, message)
+            except RECONNECT_ERRORS:
+                metrics.incr("smtp.reconnect")
+                conn = await self._open()
+                await self._send_on(conn, message)
+        metrics.incr("smtp.sent")
+
+    async def _send_on(self, conn: _Connection, message: EmailMessage) -> None:
+        """Send on ``conn`` and return it to the pool; a connection that errored is closed instead."""
+        try:
+            await conn.smtp.send_message(message)
+        except BaseException:
+            await self._discard(conn)
+            raise
+        conn.last_used = time.monotonic()
+        self._idle.append(conn)
+
+    async def _checkout(self) -> _Connection:
+        while self._idle:
+            conn = self._idle.pop()
+            if not conn.smtp.is_connected:
+                continue
+            if time.monotonic() - conn.last_used < self.idle_check_seconds:
+                return conn
+            try:
+                await conn.smtp.noop()
+                return conn
+            except (aiosmtplib.SMTPException, *RECONNECT_ERRORS):
+                await self._discard(conn)
+        return await self._open()
+
+    async def _open(self) -> _Connection:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.host,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            timeout=self.timeout,
+        )
+        await smtp.connect()
+        metrics.incr("smtp.connect")
+        return _Connection(smtp)
+
+    async def _discard(self, conn: _Connection) -> None:
+        try:
+            if conn.smtp.is_connected:
+                await conn.smtp.quit()
+        except (aiosmtplib.SMTPException, *RECONNECT_ERRORS):
+            conn.smtp.close()
+
+    async def close(self) -> None:
+        """Close every idle connection (application shutdown)."""
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            await self._discard(conn)
+
+
+def _settings_pool() -> SMTPPool:
+    settings = get_settings()
+    return SMTPPool(
+        host=settings.smtp_host,
+        port=settings.smtp_port,
+        username=settings.smtp_user,
+        password=settings.smtp_pass,
+        size=settings.smtp_pool_size,
+    )
+
+
+smtp_pool = _settings_pool()
@@ -1,19 +1,41 @@
 """Notification service."""
 import asyncio
+import json
 import logging
-import smtplib
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
 from email.message import EmailMessage
 
+from fastapi import HTTPException, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from ..core.config import get_settings
+from ..core.metrics import metrics
 from ..db.engine import async_session_maker
+from ..db.uow import UnitOfWork, after_commit
+from ..models.notification import (
+    BroadcastCreate,
+    BroadcastResult,
+    NotificationDB,
+    NotificationPublic,
+)
+from ..models.request import address_area
 from ..repositories.notification import NotificationRepository
+from ..repositories.request import RequestRepository
 from ..repositories.user import UserRepository
-from .ws import manager
+from ..utils.pagination import decode_cursor, encode_cursor
+from .broker import broker
+from .email import smtp_pool
+from .ws import RESYNC
 
 logger = logging.getLogger(__name__)
 
+# Concurrent sends per channel within one batch (email: NOTIFICATION_EMAIL_CONCURRENCY)
+CHANNEL_CONCURRENCY = {"sms": 16, "push": 16}
+_WORKER_ID = f"{socket.gethostname()[:40]}:{os.getpid()}"
+
 
 class NotificationService:
     """Service for notification operations."""
@@ -22,79 +44,288 @@ class NotificationService:
         self.repo = NotificationRepository()
         self.settings = get_settings()
         self.user_repo = UserRepository()
+        self.request_repo = RequestRepository()
+        self.session_maker = async_session_maker
 
     async def queue_notification(
         self, session: AsyncSession, *, user_id: int, channel: str, title: str, body: str, meta: dict | None = None
     ) -> dict:
         """Queue a notification."""
-        notification = await self.repo.queue(
-            session,
+        notifications = await self.queue_many(
+            session, [{"user_id": user_id, "channel": channel, "title": title, "body": body, "meta": meta}]
+        )
+        return notifications[0]
+
+    async def queue_many(self, session: AsyncSession, notifications: list[dict]) -> list[dict]:
+        """Store several notifications with one INSERT.
+
+        In-app rows are stored already ``sent`` and pushed over the WebSocket once
+        the transaction commits; other channels are ``queued`` for the dispatcher,
+        which is woken after commit. Emails to users who accept digests are held
+        until the user's open digest window closes, so they can be merged.
+        """
+        now = datetime.utcnow()
+        rows = [
+            {
+                **notification,
+                "meta": notification.get("meta") or {},
+                "status": "sent" if notification["channel"] == "inapp" else "queued",
+                "sent_at": now if notification["channel"] == "inapp" else None,
+                "created_at": now,
+            }
+            for notification in notifications
+        ]
+        async with UnitOfWork(session):
+            await self._hold_for_digest(session, rows, now)
+            created = await self.repo.queue_many(session, rows)
+            pushes = [
+                (str(notification.user_id), notification.to_public().model_dump(mode="json"))
+                for notification in created
+                if notification.channel == "inapp"
+            ]
+            for user_id, payload in pushes:
+                after_commit(session, lambda user_id=user_id, payload=payload: broker.publish(user_id, payload))
+            if len(pushes) < len(created):
+                after_commit(session, lambda: notification_dispatcher.wake())
+        return [notification.to_public().model_dump() for notification in created]
+
+    async def _hold_for_digest(self, session: AsyncSession, rows: list[dict], now: datetime) -> None:
+        """Set ``deliver_after`` on digest-eligible email rows: join the user's open window or start one."""
+        window = self.settings.notification_digest_window_seconds
+        email_users = {row["user_id"] for row in rows if row["channel"] == "email"}
+        if not window or not email_users:
+            return
+        digest_users = await self.user_repo.get_digest_enabled(session, email_users)
+        open_windows = await self.repo.open_digest_windows(session, digest_users, now)
+        for row in rows:
+            if row["channel"] == "email" and row["user_id"] in digest_users:
+                row["deliver_after"] = open_windows.get(row["user_id"], now + timedelta(seconds=window))
+
+    async def broadcast(self, session: AsyncSession, payload: BroadcastCreate, *, sender_id: int) -> BroadcastResult:
+        """Queue ``payload`` for everyone with a pickup request in the target city and/or pincode.
+
+        Recipients are read and inserted in chunks of ``NOTIFICATION_BROADCAST_CHUNK_SIZE``,
+        one executemany and one transaction per chunk, so neither the event loop nor
+        other writers wait on a large broadcast. In-app rows are handed to
+        ``push_fanout`` as each chunk commits; emails go to the dispatcher without
+        digest hold-back.
+        """
+        area = address_area({"city": payload.city, "pincode": payload.pincode})
+        now = datetime.utcnow()
+        meta = {"broadcast": {key: value for key, value in area.items() if value}, "sender_id": sender_id}
+        template = NotificationPublic(
+            id=0, user_id=0, channel="inapp", title=payload.title, body=payload.body,
+            meta=meta, status="sent", sent_at=now, created_at=now,
+        ).model_dump(mode="json")
+        meta_json = json.dumps(meta)
+
+        recipients = queued = last_id = 0
+        chunk_size = self.settings.notification_broadcast_chunk_size
+        while True:
+            async with UnitOfWork(session):
+                user_ids = await self.request_repo.requester_ids(
+                    session, **area, after_id=last_id, limit=chunk_size
+                )
+                if not user_ids:
+                    break
+                rows = self._broadcast_rows(payload, user_ids, meta_json, now)
+                created = await self.repo.insert_bulk(session, rows)
+                pushes = [(notif_id, user_id) for notif_id, user_id, channel in created if channel == "inapp"]
+                if pushes:
+                    after_commit(session, lambda pushes=pushes: push_fanout.submit(template, pushes))
+            recipients += len(user_ids)
+            queued += len(created)
+            last_id = user_ids[-1]
+
+        if recipients and "email" in payload.channels:
+            notification_dispatcher.wake()
+        metrics.incr("notification.broadcast.queued", queued)
+        return BroadcastResult(recipients=recipients, queued=queued)
+
+    @staticmethod
+    def _broadcast_rows(payload: BroadcastCreate, user_ids: list[int], meta_json: str, now: datetime) -> list[dict]:
+        return [
             {
                 "user_id": user_id,
                 "channel": channel,
-                "title": title,
-                "body": body,
-                "meta": meta or {},
-                "status": "queued",
-            },
-        )
-        if channel == "inapp":
-            # Send immediately via WebSocket
-            await manager.send(str(user_id), notification.to_public().model_dump())
-            await self.repo.mark_sent(session, notification.id, True)
-        return notification.to_public().model_dump()
+                "title": payload.title,
+                "body": payload.body,
+                "meta_json": meta_json,
+                "status": "sent" if channel == "inapp" else "queued",
+                "sent_at": now if channel == "inapp" else None,
+                "created_at": now,
+            }
+            for user_id in user_ids
+            for channel in payload.channels
+        ]
+
+    async def list_inbox(self, session: AsyncSession, user_id: int, limit: int, cursor: str | None = None) -> dict:
+        """A page of the user's notifications, newest first, with the cursor of the next page."""
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+        # One extra row tells whether another page exists
+        docs = await self.repo.list_by_user(session, user_id, limit + 1, after=after)
+        page = docs[:limit]
+        next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(docs) > limit else None
+        return {"items": [doc.to_public() for doc in page], "next_cursor": next_cursor}
+
+    async def mark_read(self, session: AsyncSession, user_id: int, up_to_id: int) -> dict:
+        """Mark in-app notifications up to ``up_to_id`` as read and return the remaining unread count."""
+        async with UnitOfWork(session):
+            unread = await self.repo.mark_read(session, user_id, up_to_id, datetime.utcnow())
+        return {"unread": unread}
 
-    async def push_inapp(self, user_id: int, payload: dict) -> None:
+    async def unread_count(self, session: AsyncSession, user_id: int) -> dict:
+        """Unread in-app notifications, read from the maintained counter."""
+        return {"unread": await self.repo.unread_count(session, user_id)}
+
+    def push_inapp(self, user_id: int, payload: dict) -> None:
         """Push an in-app notification."""
-        await manager.send(str(user_id), payload)
-
-    async def process_queue(self) -> None:
-        """Process queued notifications (called by scheduler)."""
-        async with async_session_maker() as session:
-            queued = await self.repo.find_queued(session)
-            for notification in queued:
-                success = False
+        broker.publish(str(user_id), payload)
+
+    async def replay(self, user_id: int, last_seen_id: int) -> list[dict]:
+        """In-app notifications missed since ``last_seen_id``, or a resync marker if there are too many."""
+        limit = self.settings.ws_replay_limit
+        async with self.session_maker() as session:
+            missed = await self.repo.list_since(session, user_id, last_seen_id, limit=limit + 1)
+        if len(missed) > limit:
+            return [RESYNC]
+        return [notification.to_public().model_dump(mode="json") for notification in missed]
+
+    async def process_queue(self) -> int:
+        """Claim and dispatch queued notifications until the queue is drained; return how many were handled."""
+        handled = 0
+        while True:
+            owner = f"{_WORKER_ID}:{uuid.uuid4().hex[:8]}"
+            async with self.session_maker() as session:
+                async with UnitOfWork(session):
+                    now = datetime.utcnow()
+                    await self.repo.release_expired(session, now)
+                    batch = await self.repo.claim_batch(
+                        session,
+                        owner=owner,
+                        lease_until=now + timedelta(seconds=self.settings.notification_lease_seconds),
+                        limit=self.settings.notification_batch_size,
+                        now=now,
+                    )
+                if not batch:
+                    return handled
+                recipients = await self._recipients(session, batch)
+                results = await self._dispatch(self._coalesce(batch, recipients), recipients)
+                async with UnitOfWork(session):
+                    await self.repo.complete_batch(session, owner, results)
+                sent_at = datetime.utcnow()
+                for notification in batch:
+                    if results[notification.id]:
+                        # Held digest rows count from when they came due, not the deliberate hold
+                        due = notification.deliver_after or notification.created_at
+                        latency = (sent_at - due).total_seconds() * 1000
+                        metrics.observe("notification.enqueue_to_send_ms", latency)
+            handled += len(batch)
+            if len(batch) < self.settings.notification_batch_size:
+                return handled
+
+    async def next_due_in(self) -> float | None:
+        """Seconds until the next held-back notification is due, or None if nothing is held."""
+        async with self.session_maker() as session:
+            due = await self.repo.next_due(session)
+        return None if due is None else max((due - datetime.utcnow()).total_seconds(), 0)
+
+    def _coalesce(
+        self, batch: list[NotificationDB], recipients: dict[int, str | None]
+    ) -> list[tuple[NotificationDB, list[NotificationDB]]]:
+        """Pair each outgoing message with the notifications it delivers.
+
+        Held-back (digest) emails for the same user and address are merged into a
+        single message; everything else is sent as is.
+        """
+        deliveries: list[tuple[NotificationDB, list[NotificationDB]]] = []
+        digests: dict[tuple[int, str | None], list[NotificationDB]] = {}
+        for notification in batch:
+            if notification.channel == "email" and notification.deliver_after is not None:
+                digests.setdefault((notification.user_id, recipients.get(notification.id)), []).append(notification)
+            else:
+                deliveries.append((notification, [notification]))
+
+        for members in digests.values():
+            if len(members) == 1:
+                deliveries.append((members[0], members))
+                continue
+            digest = NotificationDB(
+                id=members[0].id,
+                user_id=members[0].user_id,
+                channel="email",
+                title=f"{len(members)} updates on your pickup requests",
+                body="\n\n".join(f"{member.title}\n{member.body}" for member in members),
+            )
+            deliveries.append((digest, members))
+            metrics.incr("notification.digest.messages")
+            metrics.incr("notification.digest.merged", len(members))
+
+        emails = sum(1 for notification in batch if notification.channel == "email")
+        if emails:
+            messages = sum(1 for message, _ in deliveries if message.channel == "email")
+            metrics.observe("notification.email_merge_ratio", emails / messages)
+        return deliveries
+
+    async def _dispatch(
+        self, deliveries: list[tuple[NotificationDB, list[NotificationDB]]], recipients: dict[int, str | None]
+    ) -> dict[int, bool]:
+        """Send messages concurrently with a bounded number of in-flight sends per channel."""
+        limits = {channel: asyncio.Semaphore(limit) for channel, limit in CHANNEL_CONCURRENCY.items()}
+        limits["email"] = asyncio.Semaphore(self.settings.notification_email_concurrency)
+
+        async def send(notification: NotificationDB) -> bool:
+            if notification.channel not in limits:
+                return False
+            async with limits[notification.channel]:
                 try:
                     if notification.channel == "email":
-                        success = await self._send_email(session, notification)
-                    elif notification.channel == "sms":
-                        success = self._send_sms_stub(notification)
-                    elif notification.channel == "push":
-                        success = self._send_push_stub(notification)
+                        return await self._send_email(notification, recipients.get(notification.id))
+                    if notification.channel == "sms":
+                        return self._send_sms_stub(notification)
+                    if notification.channel == "push":
+                        return self._send_push_stub(notification)
                 except Exception as exc:
                     logger.exception("Failed to send notification %s: %s", notification.id, exc)
-                finally:
-                    await self.repo.mark_sent(session, notification.id, success)
+                return False
 
-    async def _send_email(self, session: AsyncSession, notification) -> bool:
-        """Send email notification."""
-        message = EmailMessage()
-        message["From"] = self.settings.email_from
+        outcomes = await asyncio.gather(*(send(message) for message, _ in deliveries))
+        return {
+            member.id: outcome
+            for (_, members), outcome in zip(deliveries, outcomes, strict=True)
+            for member in members
+        }
 
-        # Get recipient email
-        import json
+    async def _recipients(self, session: AsyncSession, batch: list[NotificationDB]) -> dict[int, str | None]:
+        """Resolve the email address for each email notification in a batch with at most one query."""
+        explicit: dict[int, str | None] = {}
+        for notification in batch:
+            if notification.channel != "email":
+                continue
+            meta = json.loads(notification.meta_json) if notification.meta_json else {}
+            explicit[notification.id] = meta.get("email") or meta.get("recipient")
 
-        meta = json.loads(notification.meta_json) if notification.meta_json else {}
-        recipient = meta.get("email") or meta.get("recipient")
-        if not recipient:
-            recipient_user = await self.user_repo.get_by_id(session, notification.user_id)
-            recipient = recipient_user.email if recipient_user else None
+        owners = {n.id: n.user_id for n in batch if n.id in explicit and not explicit[n.id]}
+        emails = await self.user_repo.get_emails(session, owners.values())
+        for notif_id, user_id in owners.items():
+            explicit[notif_id] = emails.get(user_id)
+        return explicit
 
-        message["To"] = recipient
-        if not message["To"]:
+    async def _send_email(self, notification: NotificationDB, recipient: str | None) -> bool:
+        """Send email notification."""
+        if not recipient:
             logger.warning("Skipping email notification %s without recipient", notification.id)
             return False
 
+        message = EmailMessage()
+        message["From"] = self.settings.email_from
+        message["To"] = recipient
         message["Subject"] = notification.title
         message.set_content(notification.body)
-
-        def _send():
-            with smtplib.SMTP(self.settings.smtp_host, self.settings.smtp_port) as smtp:
-                if self.settings.smtp_user:
-                    smtp.login(self.settings.smtp_user, self.settings.smtp_pass)
-                smtp.send_message(message)
-
-        await asyncio.to_thread(_send)
+        await smtp_pool.send(message)
         return True
 
     def _send_sms_stub(self, notification) -> bool:
@@ -112,3 +343,105 @@ class NotificationService:
             return False
         logger.info("[Push] %s", notification)
         return True
+
+
+class NotificationDispatcher:
+    """Drains the notification queue as soon as a commit enqueues work.
+
+    ``wake`` is registered as an after-commit callback by ``queue_many``,
+    so email/SMS/push sends start within milliseconds instead of at the next
+    scheduler tick; the interval job in ``workers/scheduler.py`` remains as a
+    safety net for rows queued by other processes or left behind by a crash.
+    """
+
+    def __init__(self) -> None:
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    def wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self, service: NotificationService | None = None) -> None:
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._wakeup.set()  # drain whatever is already queued
+        self._task = asyncio.create_task(self._run(service or NotificationService()))
+
+    async def stop(self) -> None:
+        task, self._task, self._wakeup = self._task, None, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self, service: NotificationService) -> None:
+        wakeup = self._wakeup
+        timeout: float | None = None
+        while True:
+            try:
+                # Sleep until woken, or until the next digest window closes
+                await asyncio.wait_for(wakeup.wait(), timeout)
+            except TimeoutError:
+                pass
+            wakeup.clear()
+            try:
+                await service.process_queue()
+                timeout = await service.next_due_in()
+            except Exception:
+                logger.exception("Notification dispatch failed")
+                timeout = None
+
+
+class PushFanout:
+    """Streams broadcast in-app pushes to sockets at no more than ``rate_per_second``.
+
+    Publishing a whole broadcast at once would hold the event loop and overflow
+    socket queues, so recipients are published in slices of a tenth of a second's
+    budget with a sleep between slices. Broadcasts are drained one after another.
+    """
+
+    def __init__(self, rate_per_second: int) -> None:
+        self.rate_per_second = rate_per_second
+        self._pending: asyncio.Queue[tuple[dict, list[tuple[int, int]]]] | None = None
+        self._task: asyncio.Task | None = None
+
+    def submit(self, template: dict, recipients: list[tuple[int, int]]) -> None:
+        """Queue ``template`` for each ``(notification_id, user_id)``; starts the drain task on first use."""
+        if self._task is None:
+            self._pending = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+        self._pending.put_nowait((template, recipients))
+
+    async def stop(self) -> None:
+        task, self._task, self._pending = self._task, None, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self) -> None:
+        pending = self._pending
+        step = max(self.rate_per_second // 10, 1)
+        while True:
+            template, recipients = await pending.get()
+            for start in range(0, len(recipients), step):
+                chunk = recipients[start:start + step]
+                try:
+                    for notif_id, user_id in chunk:
+                        broker.publish(str(user_id), {**template, "id": notif_id, "user_id": user_id})
+                except Exception:
+                    logger.exception("Broadcast push failed")
+                metrics.incr("notification.broadcast.pushed", len(chunk))
+                await asyncio.sleep(len(chunk) / self.rate_per_second)
+
+
+notification_dispatcher = NotificationDispatcher()
+push_fanout = PushFanout(get_settings().ws_broadcast_rate_per_second)
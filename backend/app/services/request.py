@@ -1,22 +1,31 @@
 """Request service."""
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta
 
 from fastapi import HTTPException, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from ..db.uow import UnitOfWork
 from ..models.request import (
     CancelRequestPayload,
     PickupRequestCreate,
+    PickupRequestDB,
     PickupRequestPublic,
+    RequestEventPage,
     RequestFilterParams,
     RequestStatus,
     SlotConfirmation,
+    summary_from_row,
 )
 from ..repositories.request import RequestRepository
+from ..utils.pagination import decode_cursor, encode_cursor
 from .notification import NotificationService
 from .reward import RewardService
+from .slot import SlotService
 
 ALLOWED_CANCEL_STATUSES = {"draft", "submitted", "scheduled"}
+EVENTS_PAGE_SIZE = 50
+# Statuses whose assigned slot no longer holds booking capacity
+RELEASED_STATUSES = {"cancelled", "failed"}
 ORDERED_STATUSES: dict[str, set[str]] = {
     "draft": {"submitted"},
     "submitted": {"pending_review", "cancelled"},
@@ -38,10 +47,30 @@ class RequestService:
         self.repo = RequestRepository()
         self.notification_service = NotificationService()
         self.reward_service = RewardService()
+        self.slot_service = SlotService()
+
+    async def _update_if_unchanged(
+        self, session: AsyncSession, request: PickupRequestDB, payload: dict
+    ) -> PickupRequestDB:
+        """Write ``payload`` only while the status and slot are still as read; 409 if another call won.
+
+        Reads run before SQLite takes the write lock, so the guarded update is
+        what keeps two concurrent calls from both releasing or reserving capacity.
+        """
+        expected = {"status": request.status, "slot_start": request.slot_start}
+        updated = await self.repo.update(session, request.id, payload, expected=expected)
+        if updated is None:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Request was changed concurrently")
+        return updated
+
+    async def _public(self, session: AsyncSession, request) -> PickupRequestPublic:
+        """Public view of a request with the first page of its timeline."""
+        events = await self.repo.list_events(session, request.id, limit=EVENTS_PAGE_SIZE)
+        return request.to_public([event.to_public() for event in events])
 
     async def create(self, session: AsyncSession, user_id: int, payload: PickupRequestCreate) -> PickupRequestPublic:
         """Create a new pickup request."""
-        data = payload.model_dump()
+        data = payload.model_dump(mode="json")
         data.update(
             {
                 "user_id": user_id,
@@ -56,25 +85,29 @@ class RequestService:
                 ],
             }
         )
-        request = await self.repo.create(session, data)
+        async with UnitOfWork(session):
+            request = await self.repo.create(session, data)
 
-        await self.notification_service.queue_notification(
-            session,
-            user_id=user_id,
-            channel="email",
-            title="Pickup request submitted",
-            body=f"Your request {request.id} is submitted",
-            meta={"request_id": request.id},
-        )
-        await self.notification_service.queue_notification(
-            session,
-            user_id=user_id,
-            channel="inapp",
-            title="Request submitted",
-            body="We received your pickup request",
-            meta={"request_id": request.id},
-        )
-        return request.to_public()
+            await self.notification_service.queue_many(
+                session,
+                [
+                    {
+                        "user_id": user_id,
+                        "channel": "email",
+                        "title": "Pickup request submitted",
+                        "body": f"Your request {request.id} is submitted",
+                        "meta": {"request_id": request.id},
+                    },
+                    {
+                        "user_id": user_id,
+                        "channel": "inapp",
+                        "title": "Request submitted",
+                        "body": "We received your pickup request",
+                        "meta": {"request_id": request.id},
+                    },
+                ],
+            )
+        return await self._public(session, request)
 
     async def list(self, session: AsyncSession, user_id: int, filters: RequestFilterParams) -> dict:
         """List pickup requests for a user."""
@@ -84,9 +117,28 @@ class RequestService:
         if filters.category:
             query["category"] = filters.category
 
-        docs, total = await self.repo.list_by_user(session, user_id, query, filters.skip, filters.limit)
+        try:
+            after = decode_cursor(filters.cursor) if filters.cursor else None
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+        # One extra row tells whether another page exists without counting
+        docs, total = await self.repo.list_by_user(
+            session,
+            user_id,
+            query,
+            filters.limit + 1,
+            skip=filters.skip,
+            after=after,
+            include_total=filters.include_total,
+            summary=filters.fields == "summary",
+        )
+        page = docs[: filters.limit]
+        next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(docs) > filters.limit else None
+        to_item = summary_from_row if filters.fields == "summary" else PickupRequestDB.to_public
         return {
-            "items": [doc.to_public() for doc in docs],
+            "items": [to_item(doc) for doc in page],
+            "next_cursor": next_cursor,
             "total": total,
             "skip": filters.skip,
             "limit": filters.limit,
@@ -97,97 +149,125 @@ class RequestService:
         request = await self.repo.get(session, request_id, user_id)
         if not request:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Request not found")
-        return request.to_public()
+        return await self._public(session, request)
 
-    async def cancel(
-        self, session: AsyncSession, request_id: int, user_id: int, payload: CancelRequestPayload | None
-    ) -> PickupRequestPublic:
-        """Cancel a pickup request."""
+    async def events(
+        self, session: AsyncSession, request_id: int, user_id: int, *, after: int | None = None, limit: int = EVENTS_PAGE_SIZE
+    ) -> RequestEventPage:
+        """Page through a pickup request's timeline."""
         request = await self.repo.get(session, request_id, user_id)
         if not request:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Request not found")
+        rows = await self.repo.list_events(session, request_id, after_id=after, limit=limit + 1)
+        next_after = rows[limit - 1].id if len(rows) > limit else None
+        return RequestEventPage(items=[row.to_public() for row in rows[:limit]], next_after=next_after)
 
-        if request.status not in ALLOWED_CANCEL_STATUSES:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot cancel in current status")
+    async def cancel(
+        self, session: AsyncSession, request_id: int, user_id: int, payload: CancelRequestPayload | None
+    ) -> PickupRequestPublic:
+        """Cancel a pickup request."""
+        async with UnitOfWork(session) as uow:
+            request = await self.repo.get(session, request_id, user_id)
+            if not request:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Request not found")
 
-        # Check 24h rule for scheduled requests
-        if request.assigned_slot_json:
-            import json
+            if request.status not in ALLOWED_CANCEL_STATUSES:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot cancel in current status")
 
-            assigned_slot = json.loads(request.assigned_slot_json)
-            slot_start = assigned_slot.get("start")
-            if slot_start:
-                if isinstance(slot_start, str):
-                    slot_start = datetime.fromisoformat(slot_start)
-                if slot_start - datetime.now(timezone.utc) < timedelta(hours=24):
-                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Too late to cancel (<24h)")
+            # Check 24h rule for scheduled requests
+            if request.slot_start and request.slot_start - datetime.utcnow() < timedelta(hours=24):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Too late to cancel (<24h)")
 
-        updated = await self.repo.update(session, request_id, {"status": "cancelled"})
-        await self.repo.append_event(
-            session,
-            request_id,
-            {
-                "type": "STATUS_CHANGE",
-                "at": datetime.utcnow().isoformat(),
-                "by": str(user_id),
-                "data": {"from": request.status, "to": "cancelled", "reason": payload.reason if payload else None},
-            },
-        )
-        return updated.to_public()
+            current, category, held_slot = request.status, request.category, request.slot_start
+            updated = await self._update_if_unchanged(session, request, {"status": "cancelled"})
+            if held_slot:
+                await self.slot_service.release(session, start=held_slot, category=category)
+                uow.after_commit(lambda: self.slot_service.track(start=held_slot, category=category, delta=-1))
+            await self.repo.append_event(
+                session,
+                request_id,
+                {
+                    "type": "STATUS_CHANGE",
+                    "at": datetime.utcnow().isoformat(),
+                    "by": str(user_id),
+                    "data": {"from": current, "to": "cancelled", "reason": payload.reason if payload else None},
+                },
+            )
+        return await self._public(session, updated)
 
     async def confirm_slot(
         self, session: AsyncSession, request_id: int, user_id: int, slot: SlotConfirmation
     ) -> PickupRequestPublic:
         """Confirm a time slot for a pickup request."""
-        request = await self.repo.get(session, request_id, user_id)
-        if not request:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Request not found")
+        async with UnitOfWork(session) as uow:
+            request = await self.repo.get(session, request_id, user_id)
+            if not request:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Request not found")
 
-        assigned_slot = {"start": slot.slot_start.isoformat(), "end": slot.slot_end.isoformat()}
-        updated = await self.repo.update(session, request_id, {"assigned_slot": assigned_slot, "status": "scheduled"})
+            current, category = request.status, request.category
+            held_slot = request.slot_start if current not in RELEASED_STATUSES else None
+            assigned_slot = {"start": slot.slot_start.isoformat(), "end": slot.slot_end.isoformat()}
+            updated = await self._update_if_unchanged(
+                session, request, {"assigned_slot": assigned_slot, "status": "scheduled"}
+            )
+            if held_slot:
+                await self.slot_service.release(session, start=held_slot, category=category)
+            await self.slot_service.reserve(session, start=slot.slot_start, end=slot.slot_end, category=category)
+            await self.repo.append_event(
+                session,
+                request_id,
+                {
+                    "type": "STATUS_CHANGE",
+                    "at": datetime.utcnow().isoformat(),
+                    "by": str(user_id),
+                    "data": {"from": current, "to": "scheduled"},
+                },
+            )
 
-        await self.repo.append_event(
-            session,
-            request_id,
-            {
-                "type": "STATUS_CHANGE",
-                "at": datetime.utcnow().isoformat(),
-                "by": str(user_id),
-                "data": {"from": request.status, "to": "scheduled"},
-            },
-        )
+            await self.notification_service.queue_notification(
+                session, user_id=user_id, channel="email", title="Pickup scheduled", body="Your slot is confirmed", meta={"request_id": request_id}
+            )
 
-        await self.notification_service.queue_notification(
-            session, user_id=user_id, channel="email", title="Pickup scheduled", body="Your slot is confirmed", meta={"request_id": request_id}
-        )
-        return updated.to_public()
+            def track_slots() -> None:
+                if held_slot:
+                    self.slot_service.track(start=held_slot, category=category, delta=-1)
+                self.slot_service.track(start=slot.slot_start, category=category, delta=1)
+
+            uow.after_commit(track_slots)
+        return await self._public(session, updated)
 
     async def transition(
         self, session: AsyncSession, request_id: int, target_status: RequestStatus, actor: str = "system"
     ) -> PickupRequestPublic:
         """Transition a request to a new status."""
-        request = await self.repo.get(session, request_id)
-        if not request:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Request not found")
+        async with UnitOfWork(session) as uow:
+            request = await self.repo.get(session, request_id)
+            if not request:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Request not found")
 
-        current = request.status
-        allowed = ORDERED_STATUSES.get(current, set())
-        if target_status not in allowed and target_status not in {"cancelled", "failed"}:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid transition")
+            current = request.status
+            allowed = ORDERED_STATUSES.get(current, set())
+            if target_status not in allowed and target_status not in {"cancelled", "failed"}:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid transition")
 
-        updated = await self.repo.update(session, request_id, {"status": target_status})
-        await self.repo.append_event(
-            session,
-            request_id,
-            {
-                "type": "STATUS_CHANGE",
-                "at": datetime.utcnow().isoformat(),
-                "by": actor,
-                "data": {"from": current, "to": target_status},
-            },
-        )
+            held_slot = request.slot_start if current not in RELEASED_STATUSES else None
+            category = request.category
+            updated = await self._update_if_unchanged(session, request, {"status": target_status})
+            if held_slot and target_status in RELEASED_STATUSES:
+                await self.slot_service.release(session, start=held_slot, category=category)
+                uow.after_commit(lambda: self.slot_service.track(start=held_slot, category=category, delta=-1))
+            await self.repo.append_event(
+                session,
+                request_id,
+                {
+                    "type": "STATUS_CHANGE",
+                    "at": datetime.utcnow().isoformat(),
+                    "by": actor,
+                    "data": {"from": current, "to": target_status},
+                },
+            )
 
-        if target_status == "completed":
-            await self.reward_service.handle_completion(session, updated)
+            if target_status == "completed":
+                await self.reward_service.handle_completion(session, updated)
 
-        return updated.to_public()
+        return await self._public(session, updated)
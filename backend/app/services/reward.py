@@ -1,6 +1,7 @@
 """Reward service."""
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from ..db.uow import UnitOfWork
 from ..models.reward import RewardPublic
 from ..repositories.request import RequestRepository
 from ..repositories.reward import RewardRepository
@@ -20,15 +21,16 @@ class RewardService:
         if points <= 0:
             return
 
-        await self.reward_repo.grant(
-            session,
-            {
-                "user_id": request.user_id,
-                "points": points,
-                "reason": f"Completed {category} pickup",
-            },
-        )
-        await self.request_repo.mark_reward(session, request.id, points)
+        async with UnitOfWork(session):
+            await self.reward_repo.grant(
+                session,
+                {
+                    "user_id": request.user_id,
+                    "points": points,
+                    "reason": f"Completed {category} pickup",
+                },
+            )
+            await self.request_repo.mark_reward(session, request.id, points)
 
     async def summary(self, session: AsyncSession, user_id: int) -> dict:
         """Get reward summary for a user."""
@@ -1,45 +1,132 @@
 """Slot service."""
-import json
-from datetime import datetime, time, timedelta
+from array import array
+from datetime import date, datetime, time, timedelta
 from typing import List
 
+from fastapi import HTTPException, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from ..core.config import get_settings
-from ..repositories.request import RequestRepository
+from ..repositories.slot import SlotCapacityRepository
+from ..utils.time import to_naive_utc
+from .slot_calendar import SlotCalendar
+
+SLOT_DAY_START_HOUR = 9
+SLOT_DAY_END_HOUR = 21
+SLOT_LENGTH = timedelta(minutes=60)
+SPECIAL_CATEGORIES = {"hazardous", "e-waste"}
+MAX_AVAILABILITY_DAYS = 31
+
+slot_calendar = SlotCalendar(
+    first_hour=SLOT_DAY_START_HOUR,
+    hours=SLOT_DAY_END_HOUR - SLOT_DAY_START_HOUR,
+    max_days=get_settings().slot_calendar_max_days,
+    ttl_seconds=get_settings().slot_calendar_ttl_seconds,
+)
+
+
+def category_class(category: str) -> str:
+    """Capacity pool a request category books against."""
+    return "special" if category in SPECIAL_CATEGORIES else "general"
 
 
 class SlotService:
     """Service for slot operations."""
 
     def __init__(self):
-        self.repo = RequestRepository()
+        self.repo = SlotCapacityRepository()
         self.settings = get_settings()
 
+    def day_capacity(self, slot_class: str) -> int:
+        """Maximum bookings per day for a category class."""
+        if slot_class == "special":
+            return self.settings.special_slot_capacity
+        return self.settings.slot_capacity_per_day
+
+    def _free_slots(self, day: date, counts: array, slot_class: str) -> list[dict]:
+        """Hourly windows of ``day`` that still have room, given booked counts per hour."""
+        if sum(counts) >= self.day_capacity(slot_class):
+            return []
+        slots: list[dict] = []
+        for index, booked in enumerate(counts):
+            if booked < self.settings.slot_capacity_per_hour:
+                start = datetime.combine(day, time(hour=SLOT_DAY_START_HOUR + index))
+                slots.append({"start": start.isoformat(), "end": (start + SLOT_LENGTH).isoformat()})
+        return slots
+
+    async def _day_counts(
+        self, session: AsyncSession, day_from: date, day_to: date, slot_class: str
+    ) -> dict[date, array]:
+        """Booked counts per day, served from the calendar with one ledger query for misses."""
+        counts: dict[date, array] = {}
+        missing: list[date] = []
+        day = day_from
+        while day <= day_to:
+            cached = slot_calendar.get(day, slot_class)
+            if cached is None:
+                missing.append(day)
+            else:
+                counts[day] = cached
+            day += timedelta(days=1)
+
+        if missing:
+            counters = await self.repo.list_booked(
+                session, day_from=missing[0], day_to=missing[-1], category_class=slot_class
+            )
+            booked: dict[date, dict[int, int]] = {}
+            for counter in counters:
+                booked.setdefault(counter.day, {})[counter.hour] = counter.booked
+            for day in missing:
+                counts[day] = slot_calendar.put(day, slot_class, booked.get(day, {}))
+        return counts
+
     async def available_slots(self, session: AsyncSession, *, date: datetime, category: str) -> List[dict]:
         """Get available slots for a given date and category."""
         base_date = date.date()
-        day_start = datetime.combine(base_date, time(hour=9))
-        day_end = datetime.combine(base_date, time(hour=21))
-        slot_length = timedelta(minutes=60)
-        slots: list[dict] = []
+        slot_class = category_class(category)
+        counts = await self._day_counts(session, base_date, base_date, slot_class)
+        return self._free_slots(base_date, counts[base_date], slot_class)
 
-        assigned = await self.repo.find_conflicting_slots(session, day_start, day_end)
-        taken = set()
-        for item in assigned:
-            if item.assigned_slot_json:
-                slot = json.loads(item.assigned_slot_json)
-                start = slot.get("start")
-                end = slot.get("end")
-                if start and end:
-                    taken.add((start, end))
-
-        capacity = self.settings.special_slot_capacity if category in {"hazardous", "e-waste"} else self.settings.slot_capacity_per_day
-        current = day_start
-        while current < day_end and len(slots) < capacity:
-            slot = {"start": current.isoformat(), "end": (current + slot_length).isoformat()}
-            if (slot["start"], slot["end"]) not in taken:
-                slots.append(slot)
-            current += slot_length
+    async def availability(
+        self, session: AsyncSession, *, day_from: date, day_to: date, category: str
+    ) -> List[dict]:
+        """Get free slots for every day in ``[day_from, day_to]`` from a single ledger query."""
+        slot_class = category_class(category)
+        counts = await self._day_counts(session, day_from, day_to, slot_class)
+        return [
+            {
+                "date": day.isoformat(),
+                "remaining": max(self.day_capacity(slot_class) - sum(day_counts), 0),
+                "slots": self._free_slots(day, day_counts, slot_class),
+            }
+            for day, day_counts in sorted(counts.items())
+        ]
 
-        return slots
+    async def reserve(self, session: AsyncSession, *, start: datetime, end: datetime, category: str) -> None:
+        """Take capacity for a slot inside the caller's transaction."""
+        start, end = to_naive_utc(start), to_naive_utc(end)
+        on_grid = start.minute == 0 and start.second == 0 and start.microsecond == 0
+        if not on_grid or not SLOT_DAY_START_HOUR <= start.hour < SLOT_DAY_END_HOUR or end - start != SLOT_LENGTH:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Slot is outside the booking grid")
+
+        slot_class = category_class(category)
+        reserved = await self.repo.reserve(
+            session,
+            day=start.date(),
+            hour=start.hour,
+            category_class=slot_class,
+            hour_capacity=self.settings.slot_capacity_per_hour,
+            day_capacity=self.day_capacity(slot_class),
+        )
+        if not reserved:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Slot is fully booked")
+
+    async def release(self, session: AsyncSession, *, start: datetime, category: str) -> None:
+        """Return the capacity held by a booked slot inside the caller's transaction."""
+        start = to_naive_utc(start)
+        await self.repo.release(session, day=start.date(), hour=start.hour, category_class=category_class(category))
+
+    def track(self, *, start: datetime, category: str, delta: int) -> None:
+        """Mirror a committed reservation (+1) or release (-1) into the slot calendar."""
+        start = to_naive_utc(start)
+        slot_calendar.adjust(start.date(), start.hour, category_class(category), delta)
@@ -0,0 +1,65 @@
+"""Process-local cache of booked-slot counters."""
+import time
+from array import array
+from collections import OrderedDict
+from datetime import date
+
+CalendarKey = tuple[date, str]
+
+
+class SlotCalendar:
+    """Bounded LRU of per-(day, category class) booked counts, one ``uint16`` per hour.
+
+    The ledger table stays the source of truth; entries are loaded lazily from it,
+    adjusted after committed reservations, and expire after ``ttl_seconds`` so
+    bookings made by other workers become visible.
+    """
+
+    def __init__(self, *, first_hour: int, hours: int, max_days: int, ttl_seconds: float) -> None:
+        self.first_hour = first_hour
+        self.hours = hours
+        self.max_days = max_days
+        self.ttl_seconds = ttl_seconds
+        self._days: OrderedDict[CalendarKey, tuple[float, array]] = OrderedDict()
+
+    def get(self, day: date, slot_class: str) -> array | None:
+        key = (day, slot_class)
+        entry = self._days.get(key)
+        if entry is None:
+            return None
+        loaded_at, counts = entry
+        if time.monotonic() - loaded_at > self.ttl_seconds:
+            del self._days[key]
+            return None
+        self._days.move_to_end(key)
+        return counts
+
+    def put(self, day: date, slot_class: str, booked: dict[int, int]) -> array:
+        counts = array("H", [0] * self.hours)
+        for hour, value in booked.items():
+            if 0 <= hour - self.first_hour < self.hours:
+                counts[hour - self.first_hour] = value
+        key = (day, slot_class)
+        self._days[key] = (time.monotonic(), counts)
+        self._days.move_to_end(key)
+        while len(self._days) > self.max_days:
+            self._days.popitem(last=False)
+        return counts
+
+    def adjust(self, day: date, hour: int, slot_class: str, delta: int) -> None:
+        """Apply a committed reservation (+1) or release (-1); unknown days stay lazy."""
+        entry = self._days.get((day, slot_class))
+        index = hour - self.first_hour
+        if entry is None or not 0 <= index < self.hours:
+            return
+        counts = entry[1]
+        counts[index] = max(counts[index] + delta, 0)
+
+    def invalidate(self, day: date, slot_class: str) -> None:
+        self._days.pop((day, slot_class), None)
+
+    def clear(self) -> None:
+        self._days.clear()
+
+    def __len__(self) -> int:
+        return len(self._days)
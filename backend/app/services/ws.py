@@ -1,26 +1,157 @@
-from typing import Dict, List
+"""WebSocket connection registry with non-blocking, per-connection delivery."""
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Dict, List, Literal
 
 from fastapi import WebSocket
 
+from ..core.config import get_settings
+from ..core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+OverflowPolicy = Literal["drop_oldest", "disconnect"]
+# Close code sent to clients evicted for falling behind (RFC 6455 "try again later")
+CLOSE_TRY_AGAIN_LATER = 1013
+# Control messages; notifications themselves are sent as plain NotificationPublic objects
+HEARTBEAT = {"type": "ping"}
+RESYNC = {"type": "resync"}
+
+Backlog = Callable[[], Awaitable[list[dict]]]
+
+
+class _Connection:
+    """One socket plus its bounded outbound queue and the task draining it."""
+
+    def __init__(self, user_id: str, websocket: WebSocket, queue_size: int) -> None:
+        self.user_id = user_id
+        self.websocket = websocket
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(queue_size)
+        self.writer: asyncio.Task | None = None
+
 
 class NotificationManager:
-    def __init__(self) -> None:
-        self.connections: Dict[str, List[WebSocket]] = {}
+    """Tracks each user's sockets; ``send`` only enqueues, a writer task per socket does the I/O.
+
+    A slow client therefore never blocks the caller or the user's other devices.
+    When a socket's queue is full the ``overflow`` policy either drops the oldest
+    pending payload or evicts the socket; sockets whose send fails or times out
+    are evicted. Idle sockets get a server-driven heartbeat every
+    ``heartbeat_seconds``, which also detects dead peers. ``on_subscribe``/``on_unsubscribe``
+    fire when a user gains their first or loses their last socket on this worker
+    (used by the push broker).
+    """
+
+    def __init__(
+        self,
+        *,
+        queue_size: int = 64,
+        overflow: OverflowPolicy = "disconnect",
+        send_timeout: float = 5,
+        heartbeat_seconds: float = 25,
+    ) -> None:
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.send_timeout = send_timeout
+        self.heartbeat_seconds = heartbeat_seconds
+        self.connections: Dict[str, List[_Connection]] = {}
+        self.on_subscribe: Callable[[str], None] | None = None
+        self.on_unsubscribe: Callable[[str], None] | None = None
 
-    async def connect(self, user_id: str, websocket: WebSocket) -> None:
+    async def connect(self, user_id: str, websocket: WebSocket, backlog: Backlog | None = None) -> None:
+        """Register a socket; ``backlog`` loads missed payloads to send before live ones.
+
+        The socket is registered before the backlog is read, so pushes committed
+        meanwhile are queued rather than lost; ones also in the backlog are skipped.
+        If loading the backlog fails the socket is unregistered and the error re-raised.
+        """
         await websocket.accept()
-        self.connections.setdefault(user_id, []).append(websocket)
+        conn = _Connection(user_id, websocket, self.queue_size)
+        if user_id not in self.connections and self.on_subscribe:
+            self.on_subscribe(user_id)
+        self.connections.setdefault(user_id, []).append(conn)
+        try:
+            replay = await backlog() if backlog else []
+        except BaseException:
+            self._remove(conn)
+            raise
+        conn.writer = asyncio.create_task(self._write(conn, replay))
 
     def disconnect(self, user_id: str, websocket: WebSocket) -> None:
-        conns = self.connections.get(user_id, [])
-        if websocket in conns:
-            conns.remove(websocket)
-        if not conns and user_id in self.connections:
-            del self.connections[user_id]
+        for conn in list(self.connections.get(user_id, [])):
+            if conn.websocket is websocket:
+                self._remove(conn)
+
+    def send(self, user_id: str, payload: dict) -> None:
+        """Queue ``payload`` for every socket of ``user_id`` and return immediately."""
+        for conn in list(self.connections.get(user_id, [])):
+            try:
+                conn.queue.put_nowait(payload)
+                continue
+            except asyncio.QueueFull:
+                metrics.incr("ws.overflow")
+            if self.overflow == "drop_oldest":
+                conn.queue.get_nowait()
+                conn.queue.put_nowait(payload)
+            else:
+                self._evict(conn, CLOSE_TRY_AGAIN_LATER)
+
+    async def _write(self, conn: _Connection, replay: list[dict]) -> None:
+        replayed = {payload.get("id") for payload in replay}
+        for payload in replay:
+            if not await self._deliver(conn, payload):
+                return
+        while True:
+            try:
+                payload = await asyncio.wait_for(conn.queue.get(), self.heartbeat_seconds)
+            except TimeoutError:
+                payload = HEARTBEAT
+            else:
+                if replayed and payload.get("id") in replayed:
+                    continue
+            if not await self._deliver(conn, payload):
+                return
+
+    async def _deliver(self, conn: _Connection, payload: dict) -> bool:
+        try:
+            await asyncio.wait_for(conn.websocket.send_json(payload), self.send_timeout)
+        except Exception as exc:
+            logger.info("Evicting websocket for user %s: %r", conn.user_id, exc)
+            self._remove(conn)
+            return False
+        metrics.incr("ws.sent")
+        return True
+
+    def _remove(self, conn: _Connection) -> None:
+        conns = self.connections.get(conn.user_id, [])
+        if conn in conns:
+            conns.remove(conn)
+            metrics.incr("ws.evicted")
+        if not conns and self.connections.pop(conn.user_id, None) is not None and self.on_unsubscribe:
+            self.on_unsubscribe(conn.user_id)
+        if conn.writer is not None and conn.writer is not asyncio.current_task():
+            conn.writer.cancel()
+
+    def _evict(self, conn: _Connection, code: int) -> None:
+        self._remove(conn)
+
+        async def close() -> None:
+            try:
+                await asyncio.wait_for(conn.websocket.close(code=code), self.send_timeout)
+            except Exception:
+                pass
+
+        asyncio.get_running_loop().create_task(close())
+
 
-    async def send(self, user_id: str, payload: dict) -> None:
-        for ws in self.connections.get(user_id, []):
-            await ws.send_json(payload)
+def _settings_manager() -> NotificationManager:
+    settings = get_settings()
+    return NotificationManager(
+        queue_size=settings.ws_queue_size,
+        overflow=settings.ws_overflow_policy,
+        heartbeat_seconds=settings.ws_heartbeat_seconds,
+    )
 
 
-manager = NotificationManager()
\ No newline at end of file
+manager = _settings_manager()
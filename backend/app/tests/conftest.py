@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.principal import principal_cache, token_cache
+from app.db.indexes import ensure_indexes
+from app.db.migrations import run_migrations
+from app.models.notification import NotificationCounterDB, NotificationDB  # noqa: F401
+from app.models.request import PickupRequestDB, RequestEventDB  # noqa: F401
+from app.models.reward import RewardDB  # noqa: F401
+from app.models.slot import SlotCapacityDB  # noqa: F401
+from app.models.user import UserDB
+from app.services.slot import slot_calendar
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def reset_caches():
+    slot_calendar.clear()
+    principal_cache.clear()
+    token_cache.clear()
+
+
+@pytest.fixture
+async def engine():
+    engine = create_async_engine(
+        "sqlite+aiosqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(run_migrations)
+        await ensure_indexes(conn)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def session(engine):
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+
+
+@pytest.fixture
+async def user(session):
+    user = UserDB(name="Citizen", email="citizen@example.com", phone="123", password_hash="x")
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
+    return user
@@ -0,0 +1,338 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.db.migrations import run_migrations
+from app.models.notification import BroadcastCreate, NotificationDB
+from app.models.user import UserDB
+from app.repositories.notification import NotificationRepository
+from app.repositories.request import RequestRepository
+from app.services import notification as notification_module
+from app.services.notification import NotificationDispatcher, NotificationService, PushFanout
+from app.services.ws import RESYNC
+
+
+async def queue_emails(session, user_id: int, count: int) -> list[int]:
+    repo = NotificationRepository()
+    ids = []
+    for index in range(count):
+        notification = await repo.queue(
+            session, {"user_id": user_id, "channel": "email", "title": f"t{index}", "body": "b", "meta": {}}
+        )
+        ids.append(notification.id)
+    await session.commit()
+    return ids
+
+
+@pytest.fixture
+def service(engine):
+    service = NotificationService()
+    service.session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    service.settings = get_settings().model_copy(
+        update={"notification_batch_size": 2, "notification_digest_window_seconds": 0}
+    )
+    return service
+
+
+@pytest.mark.anyio
+async def test_claims_do_not_overlap_and_expired_leases_return(session, user):
+    await queue_emails(session, user.id, 3)
+    repo = NotificationRepository()
+    lease = datetime.utcnow() + timedelta(minutes=2)
+
+    first = await repo.claim_batch(session, owner="a", lease_until=lease, limit=2)
+    second = await repo.claim_batch(session, owner="b", lease_until=lease, limit=2)
+    assert len(first) == 2 and len(second) == 1
+    assert not {n.id for n in first} & {n.id for n in second}
+    assert await repo.claim_batch(session, owner="c", lease_until=lease) == []
+
+    assert await repo.release_expired(session, lease + timedelta(seconds=1)) == 3
+    assert len(await repo.claim_batch(session, owner="c", lease_until=lease)) == 3
+
+
+@pytest.mark.anyio
+async def test_complete_batch_ignores_stolen_claims(session, user):
+    ids = await queue_emails(session, user.id, 2)
+    repo = NotificationRepository()
+    await repo.claim_batch(session, owner="a", lease_until=datetime.utcnow())
+
+    assert await repo.complete_batch(session, "b", {ids[0]: True}) == 0
+    assert await repo.complete_batch(session, "a", {ids[0]: True, ids[1]: False}) == 2
+    await session.commit()
+    rows = {n.id: n for n in await repo.list_by_user(session, user.id, channel="email")}
+    assert (rows[ids[0]].status, rows[ids[1]].status) == ("sent", "failed")
+    assert rows[ids[0]].claimed_by is None
+    assert isinstance(rows[ids[0]].sent_at, datetime) and rows[ids[1]].sent_at is None
+
+
+@pytest.mark.anyio
+async def test_process_queue_drains_in_batches(service, session, user, monkeypatch):
+    ids = await queue_emails(session, user.id, 5)
+    sent: list[tuple[int, str]] = []
+
+    async def fake_send(notification, recipient):
+        sent.append((notification.id, recipient))
+        return True
+
+    monkeypatch.setattr(service, "_send_email", fake_send)
+    assert await service.process_queue() == 5
+
+    assert sorted(sent) == [(notification_id, "citizen@example.com") for notification_id in ids]
+    session.expunge_all()
+    statuses = {n.status for n in await NotificationRepository().list_by_user(session, user.id, channel="email")}
+    assert statuses == {"sent"}
+    assert isinstance((await session.get(NotificationDB, ids[0])).sent_at, datetime)
+
+
+@pytest.mark.anyio
+async def test_batch_costs_constant_queries_regardless_of_size(service, engine, session, user, monkeypatch):
+    others = [UserDB(name=f"U{i}", email=f"u{i}@example.com", password_hash="x") for i in range(5)]
+    session.add_all(others)
+    await session.commit()
+
+    async def fake_send(notification, recipient):
+        return recipient is not None
+
+    monkeypatch.setattr(service, "_send_email", fake_send)
+    service.settings = service.settings.model_copy(update={"notification_batch_size": 100})
+    statements: list[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async def queries_for(users) -> int:
+        for member in users:
+            await queue_emails(session, member.id, 2)
+        statements.clear()
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            assert await service.process_queue() == 2 * len(users)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+        return len(statements)
+
+    assert await queries_for([user]) == await queries_for([user, *others])
+
+
+@pytest.mark.anyio
+async def test_enqueue_wakes_dispatcher_without_polling(service, session, user, monkeypatch):
+    sent = asyncio.Event()
+
+    async def fake_send(notification, recipient):
+        sent.set()
+        return True
+
+    monkeypatch.setattr(service, "_send_email", fake_send)
+    dispatcher = NotificationDispatcher()
+    monkeypatch.setattr(notification_module, "notification_dispatcher", dispatcher)
+    dispatcher.start(service)
+    try:
+        await asyncio.sleep(0.05)  # initial drain finds nothing
+        observed = metrics.snapshot()["summaries"].get("notification.enqueue_to_send_ms", {}).get("count", 0)
+        await service.queue_notification(session, user_id=user.id, channel="email", title="t", body="b")
+        await asyncio.wait_for(sent.wait(), timeout=2)
+        for _ in range(100):
+            summary = metrics.snapshot()["summaries"]["notification.enqueue_to_send_ms"]
+            if summary["count"] > observed:
+                break
+            await asyncio.sleep(0.01)
+        assert summary["count"] == observed + 1 and "p50" in summary
+    finally:
+        await dispatcher.stop()
+
+
+@pytest.mark.anyio
+async def test_replay_returns_missed_inapp_or_resync(service, session, user):
+    repo = NotificationRepository()
+    ids = []
+    for channel in ("inapp", "email", "inapp", "inapp"):
+        notification = await repo.queue(
+            session, {"user_id": user.id, "channel": channel, "title": "t", "body": "b", "meta": {}}
+        )
+        ids.append(notification.id)
+    await session.commit()
+
+    replayed = await service.replay(user.id, ids[0])
+    assert [item["id"] for item in replayed] == [ids[2], ids[3]]
+    assert await service.replay(user.id, ids[3]) == []
+
+    service.settings = service.settings.model_copy(update={"ws_replay_limit": 1})
+    assert await service.replay(user.id, 0) == [RESYNC]
+
+
+@pytest.mark.anyio
+async def test_queue_many_inserts_once_and_pushes_after_commit(engine, session, user, monkeypatch):
+    pushed: list[tuple[str, dict, bool]] = []
+    monkeypatch.setattr(
+        notification_module.broker,
+        "publish",
+        lambda user_id, payload: pushed.append((user_id, payload, session.in_transaction())),
+    )
+    inserts: list[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT INTO NOTIFICATIONS "):
+            inserts.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        created = await NotificationService().queue_many(
+            session,
+            [
+                {"user_id": user.id, "channel": "email", "title": "e", "body": "b"},
+                {"user_id": user.id, "channel": "inapp", "title": "i", "body": "b"},
+            ],
+        )
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    assert len(inserts) == 1
+    assert [item["status"] for item in created] == ["queued", "sent"]
+    assert [(user_id, payload["title"], in_tx) for user_id, payload, in_tx in pushed] == [(str(user.id), "i", False)]
+
+
+@pytest.mark.anyio
+async def test_emails_within_window_are_merged_into_one_digest(service, session, user, monkeypatch):
+    service.settings = service.settings.model_copy(
+        update={"notification_digest_window_seconds": 60, "notification_batch_size": 100}
+    )
+    # Digests are opt-in: only ``user`` accepts them
+    user.email_digest = True
+    opted_out = UserDB(name="O", email="o@example.com", password_hash="x")
+    session.add_all([user, opted_out])
+    await session.commit()
+    messages: list[tuple[str, str]] = []
+
+    async def fake_send(notification, recipient):
+        messages.append((recipient, notification.title))
+        return True
+
+    monkeypatch.setattr(service, "_send_email", fake_send)
+    monkeypatch.setattr(notification_module.notification_dispatcher, "wake", lambda: None)
+    for title in ("Pickup request submitted", "Pickup scheduled", "Pickup completed"):
+        await service.queue_notification(session, user_id=user.id, channel="email", title=title, body="b")
+    await service.queue_notification(session, user_id=opted_out.id, channel="email", title="Solo", body="b")
+
+    # Only the opted-out user's email is due before the window closes
+    assert await service.process_queue() == 1
+    assert messages == [("o@example.com", "Solo")]
+    assert 59 < await service.next_due_in() <= 60
+
+    ratio = metrics.snapshot()["summaries"].get("notification.email_merge_ratio", {}).get("count", 0)
+    latency = metrics.snapshot()["summaries"].get("notification.enqueue_to_send_ms", {"count": 0, "sum": 0})
+    later = datetime.utcnow() + timedelta(seconds=61)
+    monkeypatch.setattr(notification_module, "datetime", type("Clock", (datetime,), {"utcnow": staticmethod(lambda: later)}))
+    assert await service.process_queue() == 3
+    assert messages[1:] == [("citizen@example.com", "3 updates on your pickup requests")]
+    summary = metrics.snapshot()["summaries"]["notification.email_merge_ratio"]
+    assert summary["count"] == ratio + 1
+    # Latency starts when the digest came due, so the 60 s hold is not counted
+    after = metrics.snapshot()["summaries"]["notification.enqueue_to_send_ms"]
+    assert after["count"] == latency["count"] + 3
+    assert (after["sum"] - latency["sum"]) / 3 < 5_000
+    assert await service.next_due_in() is None
+
+
+@pytest.mark.anyio
+async def test_broadcast_targets_requesters_by_area_in_chunks(service, session, user, monkeypatch):
+    others = [UserDB(name=f"U{i}", email=f"b{i}@example.com", password_hash="x") for i in range(3)]
+    session.add_all(others)
+    await session.commit()
+    requests = RequestRepository()
+    for member, city, pincode in [
+        (user, "Mumbai", "400077"),
+        (user, "mumbai", "400077"),
+        (others[0], "MUMBAI ", "400001"),
+        (others[1], "Mumbai", "400 077"),
+        (others[2], "Pune", "411001"),
+    ]:
+        await requests.create(
+            session,
+            {
+                "user_id": member.id, "category": "recyclable", "description": "d", "quantity": 1,
+                "address": {"line1": "1", "city": city, "pincode": pincode}, "preferred_slots": [],
+            },
+        )
+    await session.commit()
+
+    pushed: list[tuple[str, dict]] = []
+    monkeypatch.setattr(notification_module.broker, "publish", lambda user_id, payload: pushed.append((user_id, payload)))
+    fanout = PushFanout(rate_per_second=1000)
+    monkeypatch.setattr(notification_module, "push_fanout", fanout)
+    service.settings = service.settings.model_copy(update={"notification_broadcast_chunk_size": 2})
+
+    try:
+        by_city = await service.broadcast(
+            session, BroadcastCreate(title="No pickup", body="Holiday", city="mumbai", channels=["inapp", "email"]),
+            sender_id=user.id,
+        )
+        by_pincode = await service.broadcast(
+            session, BroadcastCreate(title="No pickup", body="Holiday", pincode="400077"), sender_id=user.id
+        )
+        assert (by_city.recipients, by_city.queued) == (3, 6)
+        assert (by_pincode.recipients, by_pincode.queued) == (2, 2)
+        for _ in range(100):
+            if len(pushed) == 5:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await fanout.stop()
+
+    expected = sorted([user.id, others[0].id, others[1].id, user.id, others[1].id])
+    assert sorted(payload["user_id"] for _, payload in pushed) == expected
+    assert all(user_id == str(payload["user_id"]) for user_id, payload in pushed)
+    inbox = await NotificationRepository().list_by_user(session, others[0].id)
+    emails = await NotificationRepository().list_by_user(session, others[0].id, channel="email")
+    assert [n.status for n in inbox] == ["sent"] and [n.status for n in emails] == ["queued"]
+    assert {payload["id"] for _, payload in pushed} >= {n.id for n in inbox}
+    assert await service.unread_count(session, user.id) == {"unread": 2}
+
+
+@pytest.mark.anyio
+async def test_inbox_pages_by_cursor_and_counts_unread(service, session, user):
+    await service.queue_many(
+        session,
+        [{"user_id": user.id, "channel": channel, "title": f"t{i}", "body": "b"}
+         for i, channel in enumerate(["inapp", "email", "inapp", "inapp", "inapp"])],
+    )
+    assert await service.unread_count(session, user.id) == {"unread": 4}
+
+    first = await service.list_inbox(session, user.id, limit=3)
+    second = await service.list_inbox(session, user.id, limit=3, cursor=first["next_cursor"])
+    # The email (t1) is not part of the in-app inbox
+    assert [item.title for item in first["items"] + second["items"]] == ["t4", "t3", "t2", "t0"]
+    assert second["next_cursor"] is None
+
+    up_to = first["items"][1].id  # t3
+    assert await service.mark_read(session, user.id, up_to) == {"unread": 1}
+    assert await service.mark_read(session, user.id, up_to) == {"unread": 1}
+    assert await service.unread_count(session, user.id) == {"unread": 1}
+    session.expunge_all()
+    inbox = (await service.list_inbox(session, user.id, limit=10))["items"]
+    assert [item.title for item in inbox if item.read_at is None] == ["t4"]
+
+
+@pytest.mark.anyio
+async def test_read_tracking_migration_does_not_count_history_as_unread(engine, service, session, user):
+    await service.queue_many(
+        session, [{"user_id": user.id, "channel": "inapp", "title": f"t{i}", "body": "b"} for i in range(3)]
+    )
+    # Roll back to the schema from before read tracking
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP INDEX IF EXISTS ix_notifications_unread_user"))
+        await conn.execute(text("ALTER TABLE notifications DROP COLUMN read_at"))
+        await conn.execute(text("DELETE FROM notification_counters"))
+
+    async with engine.begin() as conn:
+        await conn.run_sync(run_migrations)
+
+    assert await service.unread_count(session, user.id) == {"unread": 0}
+    session.expunge_all()
+    inbox = (await service.list_inbox(session, user.id, limit=10))["items"]
+    assert len(inbox) == 3 and all(item.read_at == item.created_at for item in inbox)
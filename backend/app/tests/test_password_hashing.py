@@ -0,0 +1,41 @@
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from passlib.hash import bcrypt
+
+from app.core import security
+from app.core.metrics import metrics
+from app.models.user import UserDB
+from app.services.auth import AuthService
+
+
+@pytest.fixture
+def fast_context(monkeypatch):
+    context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=5)
+    monkeypatch.setattr(security, "pwd_context", context)
+    return context
+
+
+@pytest.mark.anyio
+async def test_login_rehashes_outdated_cost(session, fast_context):
+    user = UserDB(name="Old", email="old@example.com", password_hash=bcrypt.using(rounds=4).hash("secret"))
+    session.add(user)
+    await session.commit()
+    queued = metrics.snapshot()["summaries"].get("password_hash.queue_ms", {}).get("count", 0)
+
+    response = await AuthService().login(session, "old@example.com", "secret")
+
+    await session.refresh(user)
+    assert response.user.email == "old@example.com"
+    assert bcrypt.from_string(user.password_hash).rounds == 5
+    assert not fast_context.needs_update(user.password_hash)
+    assert metrics.snapshot()["summaries"]["password_hash.queue_ms"]["count"] == queued + 1
+
+
+@pytest.mark.anyio
+async def test_login_rejects_wrong_password_off_loop(session, fast_context):
+    session.add(UserDB(name="C", email="c@example.com", password_hash=await security.hash_password("secret")))
+    await session.commit()
+
+    with pytest.raises(HTTPException):
+        await AuthService().login(session, "c@example.com", "wrong")
@@ -0,0 +1,65 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import event
+
+from app.core.metrics import metrics
+from app.core.principal import token_cache
+from app.core.security import create_access_token, get_current_user
+from app.db.uow import UnitOfWork
+from app.repositories.user import UserRepository
+
+
+def bearer(token: str) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+@pytest.fixture
+def selects(engine):
+    statements: list[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
+@pytest.mark.anyio
+async def test_current_user_is_served_from_cache(session, user, selects):
+    user_id = user.id
+    session.expunge_all()
+    credentials = bearer(create_access_token(str(user_id)))
+    misses = metrics.counter("cache.principal.miss")
+    hits = metrics.counter("cache.principal.hit")
+
+    first = await get_current_user(credentials, session)
+    loaded = len(selects)
+    second = await get_current_user(credentials, session)
+
+    assert first == second and first.id == user_id
+    assert loaded == 1 and len(selects) == loaded
+    assert metrics.counter("cache.principal.miss") == misses + 1
+    assert metrics.counter("cache.principal.hit") == hits + 1
+    assert len(token_cache) == 1
+
+
+@pytest.mark.anyio
+async def test_role_change_invalidates_cached_principal(session, user):
+    user_id = user.id
+    credentials = bearer(create_access_token(str(user_id)))
+    assert (await get_current_user(credentials, session)).role == "citizen"
+
+    async with UnitOfWork(session):
+        await UserRepository().update(session, user_id, {"role": "operator"})
+
+    assert (await get_current_user(credentials, session)).role == "operator"
+
+
+@pytest.mark.anyio
+async def test_invalid_token_is_not_memoized(session):
+    with pytest.raises(HTTPException):
+        await get_current_user(bearer("not-a-jwt"), session)
+    assert len(token_cache) == 0
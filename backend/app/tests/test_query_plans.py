@@ -0,0 +1,116 @@
+"""Every repository query must be served by an index search, never a full table or index scan."""
+import re
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.db.indexes import INDEXES
+from app.repositories.notification import NotificationRepository
+from app.repositories.request import RequestRepository
+from app.repositories.reward import RewardRepository
+from app.repositories.slot import SlotCapacityRepository
+from app.repositories.user import UserRepository
+
+SCAN = re.compile(r"^SCAN (?!CONSTANT ROW)\S+(?: USING (?:COVERING )?INDEX (\w+))?")
+# Scanning a partial index only visits the rows its WHERE clause selects (e.g. the queue)
+PARTIAL_INDEXES = {index.name for index in INDEXES if index.dialect_options["sqlite"]["where"] is not None}
+
+
+def is_full_scan(detail: str) -> bool:
+    """A table or index scan without a search predicate, unless the index itself is partial."""
+    match = SCAN.match(detail)
+    return bool(match) and match.group(1) not in PARTIAL_INDEXES
+
+
+@pytest.fixture
+def captured(engine):
+    statements: list[tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")) and not executemany:
+            statements.append((statement, tuple(parameters or ())))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
+async def exercise_repositories(session, user_id: int) -> None:
+    requests = RequestRepository()
+    request = await requests.create(
+        session,
+        {
+            "user_id": user_id,
+            "category": "recyclable",
+            "description": "Old newspapers",
+            "quantity": 1,
+            "address": {"line1": "123", "city": "Mumbai", "pincode": "400077"},
+            "preferred_slots": [],
+            "status": "submitted",
+            "events": [{"type": "NOTE", "at": datetime.utcnow().isoformat(), "by": "system"}],
+        },
+    )
+    await session.commit()
+    cursor = (datetime.utcnow(), request.id)
+    for filters in ({}, {"status": "submitted"}, {"status": "submitted", "category": "recyclable"}):
+        await requests.list_by_user(session, user_id, filters, 10, include_total=True)
+        await requests.list_by_user(session, user_id, filters, 10, after=cursor)
+    await requests.get(session, request.id, user_id)
+    await requests.update(session, request.id, {"status": "scheduled"})
+    await requests.append_event(session, request.id, {"type": "NOTE", "at": datetime.utcnow(), "by": "system"})
+    await requests.list_events(session, request.id, after_id=1)
+    await requests.mark_reward(session, request.id, 5)
+    await requests.requester_ids(session, city="mumbai")
+    await requests.requester_ids(session, pincode="400077")
+    await requests.requester_ids(session, city="Mumbai", pincode="400077")
+    await requests.cleanup_drafts(session, datetime.utcnow() - timedelta(days=7))
+
+    notifications = NotificationRepository()
+    notification = await notifications.queue(
+        session, {"user_id": user_id, "channel": "email", "title": "t", "body": "b", "meta": {}}
+    )
+    await notifications.release_expired(session, datetime.utcnow())
+    await notifications.claim_batch(session, owner="worker", lease_until=datetime.utcnow(), limit=10)
+    await notifications.complete_batch(session, "worker", {notification.id: True})
+    await notifications.list_by_user(session, user_id)
+    await notifications.list_by_user(session, user_id, after=(datetime.utcnow(), notification.id))
+    await notifications.queue(session, {"user_id": user_id, "channel": "inapp", "title": "t", "body": "b"})
+    await notifications.unread_count(session, user_id)
+    await notifications.mark_read(session, user_id, notification.id, datetime.utcnow())
+    await notifications.list_since(session, user_id, 0)
+    await notifications.open_digest_windows(session, [user_id], datetime.utcnow())
+    await notifications.next_due(session)
+
+    rewards = RewardRepository()
+    await rewards.grant(session, {"user_id": user_id, "points": 5, "reason": "test"})
+    await rewards.list_recent(session, user_id)
+    await rewards.total_points(session, user_id)
+
+    users = UserRepository()
+    await users.get_by_email(session, "citizen@example.com")
+    await users.get_by_id(session, user_id)
+    await users.get_emails(session, [user_id, user_id + 1])
+    await users.get_digest_enabled(session, [user_id])
+
+    slots = SlotCapacityRepository()
+    day = date(2030, 1, 1)
+    await slots.reserve(session, day=day, hour=9, category_class="general", hour_capacity=1, day_capacity=24)
+    await slots.release(session, day=day, hour=9, category_class="general")
+    await slots.list_booked(session, day_from=day, day_to=day + timedelta(days=13), category_class="general")
+    await session.commit()
+
+
+@pytest.mark.anyio
+async def test_repository_queries_use_indexes(engine, session, user, captured):
+    await exercise_repositories(session, user.id)
+    assert captured
+
+    scans = []
+    async with engine.connect() as conn:
+        for statement, parameters in captured:
+            plan = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            details = [row[3] for row in plan.all()]
+            if any(is_full_scan(detail) for detail in details):
+                scans.append((" ".join(statement.split()), details))
+    assert not scans, scans
@@ -0,0 +1,118 @@
+import sqlite3
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import rate_limit
+from app.core.metrics import metrics
+from app.core.rate_limit import (
+    GCRARateLimiter,
+    MemoryRateLimitStore,
+    SQLiteRateLimitStore,
+    rate_limit_middleware,
+)
+from app.core.security import create_access_token
+from app.main import app as main_app
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteRateLimitStore(str(tmp_path / "rate_limit.db"))
+    return MemoryRateLimitStore()
+
+
+def test_burst_then_steady_rate(store):
+    limiter = GCRARateLimiter(rate_per_min=60, burst=3, store=store)
+    assert [limiter.hit("ip:a", now=0) for _ in range(3)] == [0, 0, 0]
+    assert limiter.hit("ip:a", now=0) == pytest.approx(1)
+    assert limiter.hit("ip:b", now=0) == 0
+    assert limiter.hit("ip:a", now=1) == 0
+
+
+def test_cost_weights_consume_more_budget(store):
+    limiter = GCRARateLimiter(rate_per_min=60, burst=5, store=store)
+    assert limiter.hit("ip:a", cost=5, now=0) == 0
+    assert limiter.hit("ip:a", cost=1, now=0) == pytest.approx(1)
+
+
+def test_idle_keys_are_swept_and_bounded():
+    limiter = GCRARateLimiter(rate_per_min=60, store=MemoryRateLimitStore(max_keys=2))
+    for key in ("a", "b", "c"):
+        limiter.hit(key, now=0)
+    assert len(limiter) == 2
+    assert limiter.sweep(now=10) == 2
+    assert len(limiter) == 0
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "rate_limit.db")
+    first = GCRARateLimiter(rate_per_min=60, burst=2, store=SQLiteRateLimitStore(path))
+    second = GCRARateLimiter(rate_per_min=60, burst=2, store=SQLiteRateLimitStore(path))
+    assert first.hit("ip:a", now=100) == 0
+    assert second.hit("ip:a", now=100) == 0
+    assert first.hit("ip:a", now=100) == pytest.approx(1)
+    assert second.sweep(now=200) == 1
+
+
+def test_middleware_returns_429_with_retry_after(monkeypatch):
+    monkeypatch.setattr(rate_limit, "rate_limiter", GCRARateLimiter(rate_per_min=60, burst=1))
+    app = FastAPI()
+    app.middleware("http")(rate_limit_middleware)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    client = TestClient(app)
+    assert client.get("/ping").status_code == 200
+    limited = client.get("/ping")
+    assert limited.status_code == 429
+    assert limited.headers["Retry-After"] == "1"
+
+    # An authenticated caller gets its own budget instead of sharing the IP's
+    token = create_access_token("42")
+    assert client.get("/ping", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+
+def test_cross_origin_429_is_readable_by_the_browser(monkeypatch):
+    monkeypatch.setattr(rate_limit, "rate_limiter", GCRARateLimiter(rate_per_min=2, burst=1))
+    client = TestClient(main_app)
+    origin = {"Origin": "http://localhost:5173"}
+    assert client.get("/health", headers=origin).status_code == 200
+    limited = client.get("/health", headers=origin)
+
+    assert limited.status_code == 429
+    assert limited.headers["access-control-allow-origin"] == "http://localhost:5173"
+    assert limited.headers["Retry-After"] == "30"
+
+
+def test_locked_sqlite_store_fails_open_without_stalling(monkeypatch, tmp_path):
+    path = str(tmp_path / "rate_limit.db")
+    limiter = GCRARateLimiter(rate_per_min=60, burst=1, store=SQLiteRateLimitStore(path))
+    monkeypatch.setattr(rate_limit, "rate_limiter", limiter)
+    app = FastAPI()
+    app.middleware("http")(rate_limit_middleware)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    client = TestClient(app)
+    assert client.get("/ping").status_code == 200
+    # Another worker holds the write lock
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    errors = metrics.counter("rate_limit.store_errors")
+    try:
+        started = time.perf_counter()
+        response = client.get("/ping")
+        elapsed = time.perf_counter() - started
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+
+    assert response.status_code == 200 and elapsed < 0.5
+    assert metrics.counter("rate_limit.store_errors") == errors + 1
@@ -0,0 +1,143 @@
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from app.db.migrations import run_migrations
+from app.models.request import (
+    PickupRequestCreate,
+    PickupRequestSummary,
+    RequestFilterParams,
+    SlotConfirmation,
+)
+from app.repositories.request import RequestRepository
+from app.services.request import RequestService
+
+
+def make_payload(**overrides) -> PickupRequestCreate:
+    data = {
+        "category": "recyclable",
+        "description": "Old newspapers",
+        "quantity": 3,
+        "address": {"line1": "123", "city": "Mumbai", "pincode": "400077"},
+        "preferred_slots": [],
+        **overrides,
+    }
+    return PickupRequestCreate(**data)
+
+
+@pytest.mark.anyio
+async def test_events_are_appended_as_rows_and_paged(session, user):
+    user_id = user.id
+    service = RequestService()
+    created = await service.create(session, user_id, make_payload())
+    assert [event.data for event in created.events] == [{"status": "submitted"}]
+
+    repo = RequestRepository()
+    for index in range(4):
+        await repo.append_event(
+            session, created.id, {"type": "NOTE", "at": datetime.utcnow().isoformat(), "by": "ops", "data": {"n": index}}
+        )
+
+    first = await service.events(session, created.id, user_id, limit=3)
+    assert len(first.items) == 3 and first.next_after is not None
+    rest = await service.events(session, created.id, user_id, after=first.next_after, limit=3)
+    assert [event.data for event in rest.items] == [{"n": 2}, {"n": 3}]
+    assert rest.next_after is None
+
+    listed = await service.list(session, user_id, RequestFilterParams())
+    assert listed["items"][0].events == []
+
+
+@pytest.mark.anyio
+async def test_state_change_commits_once(session, user):
+    user_id = user.id
+    service = RequestService()
+    created = await service.create(session, user_id, make_payload())
+    repo = RequestRepository()
+    for target in ("pending_review", "scheduled", "enroute", "onsite", "collecting", "collected", "handover"):
+        await service.transition(session, created.id, target)
+
+    await service.transition(session, created.id, "verification")
+    commits = []
+    event.listen(session.sync_session, "after_commit", commits.append)
+    # status update, event insert, reward grant and reward mark land in one commit
+    completed = await service.transition(session, created.id, "completed")
+    assert len(commits) == 1
+    assert completed.reward_points == 5
+    assert (await repo.get(session, created.id)).reward_points == 5
+
+
+@pytest.mark.anyio
+async def test_cursor_pagination_walks_every_row_once(session, user):
+    user_id = user.id
+    service = RequestService()
+    created = [await service.create(session, user_id, make_payload()) for _ in range(5)]
+
+    seen, cursor = [], None
+    while True:
+        page = await service.list(session, user_id, RequestFilterParams(limit=2, cursor=cursor))
+        assert page["total"] is None
+        seen.extend(item.id for item in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert seen == [request.id for request in reversed(created)]
+
+    counted = await service.list(session, user_id, RequestFilterParams(limit=2, include_total=True))
+    assert counted["total"] == 5
+
+
+@pytest.mark.anyio
+async def test_summary_listing_selects_only_projection(engine, session, user):
+    user_id = user.id
+    service = RequestService()
+    created = await service.create(session, user_id, make_payload())
+    await service.confirm_slot(
+        session,
+        created.id,
+        user_id,
+        SlotConfirmation(slot_start=datetime(2030, 1, 10, 9), slot_end=datetime(2030, 1, 10, 10)),
+    )
+
+    statements = []
+
+    def listener(conn, cursor, statement, *_):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", listener)
+    page = await service.list(session, user_id, RequestFilterParams(fields="summary"))
+    event.remove(engine.sync_engine, "before_cursor_execute", listener)
+
+    summary = page["items"][0]
+    assert isinstance(summary, PickupRequestSummary)
+    assert summary.status == "scheduled"
+    assert summary.assigned_slot.start == datetime(2030, 1, 10, 9)
+    assert not any("_json" in statement for statement in statements)
+
+
+@pytest.mark.anyio
+async def test_legacy_events_migrate_without_blocking_on_bad_entries(engine, session, user):
+    created = await RequestRepository().create(
+        session,
+        {
+            "user_id": user.id, "category": "recyclable", "description": "d", "quantity": 1,
+            "address": {"line1": "1", "city": "Mumbai", "pincode": "400077"}, "preferred_slots": [],
+            "events_json": json.dumps(
+                [
+                    {"type": "NOTE", "at": "2030-01-10T09:00:00+00:00", "by": "ops"},
+                    {"type": "NOTE", "by": "ops"},
+                    {"type": "NOTE", "at": "yesterday"},
+                    "not an event",
+                ]
+            ),
+        },
+    )
+    await session.commit()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(run_migrations)
+
+    events = await RequestRepository().list_events(session, created.id)
+    assert [event.at for event in events] == [datetime(2030, 1, 10, 9), created.created_at]
@@ -0,0 +1,167 @@
+import asyncio
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.indexes import ensure_indexes
+from app.db.migrations import run_migrations
+from app.models.request import PickupRequestDB, SlotConfirmation
+from app.models.slot import SlotCapacityDB
+from app.models.user import UserDB
+from app.repositories.request import RequestRepository
+from app.services.request import RequestService
+from app.services.slot import SlotService, slot_calendar
+from app.services.slot_calendar import SlotCalendar
+
+
+async def make_request(session, user_id: int, **overrides):
+    data = {
+        "user_id": user_id,
+        "category": "recyclable",
+        "description": "Old newspapers",
+        "quantity": 3,
+        "address": {"line1": "123", "city": "Mumbai", "pincode": "400077"},
+        "preferred_slots": [],
+        "status": "submitted",
+        **overrides,
+    }
+    return await RequestRepository().create(session, data)
+
+
+async def book(session, request, start: datetime):
+    slot = SlotConfirmation(slot_start=start, slot_end=start + timedelta(hours=1))
+    return await RequestService().confirm_slot(session, request.id, request.user_id, slot)
+
+
+@pytest.mark.anyio
+async def test_available_slots_skip_booked_and_release_on_cancel(session, user):
+    user_id = user.id
+    booked = datetime(2030, 1, 10, 9)
+    await book(session, await make_request(session, user_id), booked)
+    cancelled = await make_request(session, user_id)
+    await book(session, cancelled, booked + timedelta(hours=1))
+    await RequestService().cancel(session, cancelled.id, user_id, None)
+
+    slots = await SlotService().available_slots(session, date=booked, category="recyclable")
+    starts = [slot["start"] for slot in slots]
+    assert booked.isoformat() not in starts
+    assert (booked + timedelta(hours=1)).isoformat() in starts
+
+
+@pytest.mark.anyio
+async def test_confirm_slot_enforces_capacity(session, user):
+    user_id = user.id  # a failed reservation rolls back and expires loaded rows
+    booked = datetime(2030, 1, 10, 9)
+    await book(session, await make_request(session, user_id), booked)
+    with pytest.raises(HTTPException) as exc:
+        await book(session, await make_request(session, user_id), booked)
+    assert exc.value.status_code == 409
+
+    # special categories share a small per-day pool (SPECIAL_SLOT_CAPACITY=2)
+    for hour in (10, 11):
+        await book(session, await make_request(session, user_id, category="e-waste"), booked.replace(hour=hour))
+    with pytest.raises(HTTPException):
+        await book(session, await make_request(session, user_id, category="e-waste"), booked.replace(hour=12))
+    assert await SlotService().available_slots(session, date=booked, category="e-waste") == []
+
+
+@pytest.mark.anyio
+async def test_availability_range_matches_single_day(session, user):
+    user_id = user.id
+    booked = datetime(2030, 1, 11, 15)
+    await book(session, await make_request(session, user_id), booked)
+
+    service = SlotService()
+    days = await service.availability(
+        session, day_from=booked.date() - timedelta(days=1), day_to=booked.date() + timedelta(days=1), category="recyclable"
+    )
+    assert [day["date"] for day in days] == ["2030-01-10", "2030-01-11", "2030-01-12"]
+    for day in days:
+        single = await service.available_slots(session, date=datetime.fromisoformat(day["date"]), category="recyclable")
+        assert day["slots"] == single
+    assert days[1]["remaining"] == days[0]["remaining"] - 1
+
+
+@pytest.mark.anyio
+async def test_calendar_serves_reads_and_tracks_changes(session, user):
+    user_id = user.id
+    day = datetime(2030, 1, 10, 9)
+    service = SlotService()
+    assert len(await service.available_slots(session, date=day, category="recyclable")) == 12
+    assert len(slot_calendar) == 1
+
+    request = await make_request(session, user_id)
+    await book(session, request, day)
+    assert len(await service.available_slots(session, date=day, category="recyclable")) == 11
+    await RequestService().transition(session, request.id, "cancelled")
+    assert len(await service.available_slots(session, date=day, category="recyclable")) == 12
+
+
+def test_calendar_lru_is_bounded():
+    calendar = SlotCalendar(first_hour=9, hours=12, max_days=2, ttl_seconds=60)
+    for offset in range(3):
+        calendar.put(date(2030, 1, 1 + offset), "general", {9: 1})
+    assert len(calendar) == 2
+    assert calendar.get(date(2030, 1, 1), "general") is None
+    calendar.adjust(date(2030, 1, 3), 10, "general", 1)
+    assert list(calendar.get(date(2030, 1, 3), "general")[:2]) == [1, 1]
+
+
+@pytest.mark.anyio
+async def test_concurrent_confirms_keep_the_ledger_consistent(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'race.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(run_migrations)
+        await ensure_indexes(conn)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        user = UserDB(name="Citizen", email="race@example.com", password_hash="x")
+        session.add(user)
+        await session.commit()
+        request = await make_request(session, user.id)
+        await session.commit()
+
+    # Both calls read the request before either one writes
+    readers = asyncio.Barrier(2)
+    get = RequestRepository.get
+
+    async def get_then_wait(self, *args, **kwargs):
+        found = await get(self, *args, **kwargs)
+        await readers.wait()
+        return found
+
+    monkeypatch.setattr(RequestRepository, "get", get_then_wait)
+
+    async def confirm(hour: int):
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            return await book(session, request, datetime(2030, 1, 10, hour))
+
+    outcomes = await asyncio.gather(confirm(9), confirm(10), return_exceptions=True)
+    monkeypatch.undo()
+    assert sorted(type(outcome).__name__ for outcome in outcomes) == ["HTTPException", "PickupRequestPublic"]
+    assert next(o for o in outcomes if isinstance(o, HTTPException)).status_code == 409
+
+    async with AsyncSession(engine) as session:
+        stored = await session.get(PickupRequestDB, request.id)
+        ledger = (await session.exec(select(SlotCapacityDB).where(SlotCapacityDB.booked > 0))).all()
+    assert [(row.hour, row.booked) for row in ledger] == [(stored.slot_start.hour, 1)]
+    await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_startup_rebuild_repairs_ledger_drift(engine, session, user):
+    booked = datetime(2030, 1, 10, 9)
+    await book(session, await make_request(session, user.id), booked)
+    session.add(SlotCapacityDB(day=booked.date(), hour=10, category_class="general", booked=1))  # leaked unit
+    await session.commit()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(run_migrations)
+
+    session.expunge_all()
+    ledger = (await session.exec(select(SlotCapacityDB).where(SlotCapacityDB.booked > 0))).all()
+    assert [(row.day, row.hour, row.booked) for row in ledger] == [(booked.date(), 9, 1)]
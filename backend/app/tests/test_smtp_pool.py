@@ -0,0 +1,24 @@
+import pytest
+
+from app.scripts.bench_smtp import SMTPStandIn, build_message
+from app.services.email import SMTPPool
+
+
+@pytest.fixture
+async def smtp_server():
+    server = await SMTPStandIn(max_messages_per_connection=3).start()
+    yield server
+    await server.stop()
+
+
+@pytest.mark.anyio
+async def test_pool_reuses_connections_and_reconnects_when_dropped(smtp_server):
+    pool = SMTPPool(host="127.0.0.1", port=smtp_server.port, username="user", password="pass", size=1)
+
+    for index in range(5):
+        await pool.send(build_message(index))
+    await pool.close()
+
+    # The stand-in hangs up after 3 messages; the 4th is retried on a new connection
+    assert smtp_server.messages == 5
+    assert smtp_server.connections == 2
@@ -0,0 +1,112 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from app.core.metrics import metrics
+from app.services.broker import UnixSocketBroker
+
+
+@pytest.fixture
+async def workers(tmp_path):
+    inboxes: dict[str, list] = {"a": [], "b": []}
+    brokers = {
+        name: UnixSocketBroker(str(tmp_path), lambda user, payload, inbox=inbox: inbox.append((user, payload)), worker_id=name)
+        for name, inbox in inboxes.items()
+    }
+    for broker in brokers.values():
+        await broker.start()
+    yield brokers, inboxes
+    for broker in brokers.values():
+        await broker.stop()
+
+
+@pytest.mark.anyio
+async def test_push_reaches_user_on_other_worker_only(workers):
+    brokers, inboxes = workers
+    brokers["b"].subscribe("7")
+    await brokers["b"].flush()
+
+    brokers["a"].publish("7", {"title": "hello"})
+    brokers["a"].publish("8", {"title": "nobody"})
+    for _ in range(100):
+        if inboxes["b"]:
+            break
+        await asyncio.sleep(0.01)
+
+    assert inboxes["b"] == [("7", {"title": "hello"})]
+    assert inboxes["a"] == []
+
+
+@pytest.mark.anyio
+async def test_routes_of_crashed_worker_are_pruned(workers):
+    brokers, _ = workers
+    brokers["b"].subscribe("7")
+    await brokers["b"].flush()
+    routes = brokers["a"]._db
+    routes.execute("INSERT INTO ws_routes (user_id, worker) VALUES ('7', 'crashed')")
+
+    brokers["a"].publish("7", {"title": "hello"})
+    await brokers["a"].flush()
+
+    assert routes.execute("SELECT worker FROM ws_routes").fetchall() == [("b",)]
+
+
+class _LockedRoutes:
+    def execute(self, *args):
+        raise sqlite3.OperationalError("database is locked")
+
+
+@pytest.mark.anyio
+async def test_route_table_errors_are_logged_not_raised(workers, monkeypatch):
+    brokers, inboxes = workers
+    routes = brokers["a"]._db
+    errors = metrics.counter("ws.broker.errors")
+    monkeypatch.setattr(brokers["a"], "_db", _LockedRoutes())
+
+    brokers["a"].subscribe("7")
+    brokers["a"].publish("7", {"title": "hello"})
+    await brokers["a"].flush()
+
+    assert inboxes["a"] == [("7", {"title": "hello"})]
+    assert metrics.counter("ws.broker.errors") == errors + 2
+    monkeypatch.setattr(brokers["a"], "_db", routes)
+
+
+@pytest.mark.anyio
+async def test_publish_reads_routes_once_per_ttl(workers, monkeypatch):
+    brokers, inboxes = workers
+    queries: list[str] = []
+    execute = brokers["a"]._execute
+
+    async def counting(sql, params=()):
+        queries.append(sql.split()[0])
+        return await execute(sql, params)
+
+    monkeypatch.setattr(brokers["a"], "_execute", counting)
+    brokers["a"].subscribe("7")
+    await brokers["a"].flush()
+    for n in range(3):
+        brokers["a"].publish("7", {"n": n})
+        await brokers["a"].flush()
+
+    assert inboxes["a"] == [("7", {"n": 0}), ("7", {"n": 1}), ("7", {"n": 2})]
+    assert queries == ["INSERT", "SELECT"]
+
+
+@pytest.mark.anyio
+async def test_new_socket_on_another_worker_invalidates_cached_routes(workers):
+    brokers, inboxes = workers
+    brokers["a"].publish("7", {"title": "nobody yet"})
+    await brokers["a"].flush()
+
+    brokers["b"].subscribe("7")
+    await brokers["b"].flush()
+    await asyncio.sleep(0.01)
+    brokers["a"].publish("7", {"title": "hello"})
+    for _ in range(100):
+        if inboxes["b"]:
+            break
+        await asyncio.sleep(0.01)
+
+    assert inboxes["b"] == [("7", {"title": "hello"})]
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from app.core.metrics import metrics
+from app.services.ws import HEARTBEAT, NotificationManager
+
+
+class FakeSocket:
+    def __init__(self, delay: float = 0, fail: bool = False) -> None:
+        self.delay = delay
+        self.fail = fail
+        self.received: list[dict] = []
+        self.closed_with: int | None = None
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_json(self, payload: dict) -> None:
+        if self.fail:
+            raise RuntimeError("socket is gone")
+        await asyncio.sleep(self.delay)
+        self.received.append(payload)
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed_with = code
+
+
+@pytest.mark.anyio
+async def test_send_returns_immediately_and_slow_device_does_not_block_others():
+    manager = NotificationManager(queue_size=8)
+    slow, fast = FakeSocket(delay=10), FakeSocket()
+    await manager.connect("1", slow)
+    await manager.connect("1", fast)
+
+    manager.send("1", {"n": 1})
+    await asyncio.sleep(0.01)
+
+    assert fast.received == [{"n": 1}] and slow.received == []
+    manager.disconnect("1", slow)
+    manager.disconnect("1", fast)
+    await asyncio.sleep(0)
+    assert manager.connections == {}
+
+
+@pytest.mark.anyio
+async def test_overflow_evicts_or_drops_oldest():
+    manager = NotificationManager(queue_size=1)
+    stuck = FakeSocket(delay=10)
+    await manager.connect("1", stuck)
+    for n in range(3):
+        manager.send("1", {"n": n})
+    await asyncio.sleep(0.01)
+    assert manager.connections == {} and stuck.closed_with == 1013
+
+    manager = NotificationManager(queue_size=1, overflow="drop_oldest")
+    stuck = FakeSocket(delay=10)
+    await manager.connect("1", stuck)
+    for n in range(3):
+        manager.send("1", {"n": n})
+    assert manager.connections["1"][0].queue.get_nowait() == {"n": 2}
+    manager.disconnect("1", stuck)
+    await asyncio.sleep(0)
+
+
+@pytest.mark.anyio
+async def test_dead_socket_is_evicted():
+    manager = NotificationManager()
+    evicted = metrics.counter("ws.evicted")
+    await manager.connect("1", FakeSocket(fail=True))
+
+    manager.send("1", {"n": 1})
+    await asyncio.sleep(0.01)
+
+    assert manager.connections == {}
+    assert metrics.counter("ws.evicted") == evicted + 1
+
+
+@pytest.mark.anyio
+async def test_replay_precedes_live_pushes_without_duplicates():
+    manager = NotificationManager()
+    socket = FakeSocket()
+
+    async def backlog():
+        # A push for id 2 commits while the backlog is being read
+        manager.send("1", {"id": 2})
+        manager.send("1", {"id": 3})
+        return [{"id": 1}, {"id": 2}]
+
+    await manager.connect("1", socket, backlog=backlog)
+    await asyncio.sleep(0.01)
+
+    assert socket.received == [{"id": 1}, {"id": 2}, {"id": 3}]
+    manager.disconnect("1", socket)
+    await asyncio.sleep(0)
+
+
+@pytest.mark.anyio
+async def test_failed_backlog_unregisters_socket():
+    manager = NotificationManager()
+    unsubscribed: list[str] = []
+    manager.on_unsubscribe = unsubscribed.append
+
+    async def backlog():
+        raise RuntimeError("database is locked")
+
+    with pytest.raises(RuntimeError):
+        await manager.connect("1", FakeSocket(), backlog=backlog)
+
+    assert manager.connections == {} and unsubscribed == ["1"]
+
+
+@pytest.mark.anyio
+async def test_idle_socket_gets_server_heartbeat():
+    manager = NotificationManager(heartbeat_seconds=0.01)
+    socket = FakeSocket()
+    await manager.connect("1", socket)
+    await asyncio.sleep(0.035)
+
+    assert socket.received[:2] == [HEARTBEAT, HEARTBEAT]
+    manager.disconnect("1", socket)
+    await asyncio.sleep(0)
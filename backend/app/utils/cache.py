@@ -0,0 +1,51 @@
+"""Bounded in-process TTL/LRU cache."""
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, TypeVar
+
+from ..core.metrics import metrics
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """LRU cache whose entries expire ``ttl_seconds`` after insertion (or at a per-entry deadline).
+
+    Hits and misses are counted as ``cache.<name>.hit`` / ``cache.<name>.miss``.
+    """
+
+    def __init__(self, name: str, *, maxsize: int, ttl_seconds: float) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: Hashable) -> V | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            metrics.incr(f"cache.{self.name}.miss")
+            return None
+        self._entries.move_to_end(key)
+        metrics.incr(f"cache.{self.name}.hit")
+        return entry[1]
+
+    def set(self, key: Hashable, value: V, ttl_seconds: float | None = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,17 @@
+"""Datetime helpers shared by repositories and services."""
+from datetime import datetime, timezone
+
+
+def to_naive_utc(value: datetime | str | None) -> datetime | None:
+    """Normalize a datetime (or ISO string) to a naive UTC datetime.
+
+    SQLite ``DATETIME`` columns drop tzinfo, so every stored timestamp is kept as
+    naive UTC to make range comparisons consistent.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
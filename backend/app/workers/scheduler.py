@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from ..db.engine import async_session_maker
+from ..db.uow import UnitOfWork
 from ..repositories.request import RequestRepository
 from ..services.notification import NotificationService
 
@@ -15,7 +16,7 @@ scheduler = AsyncIOScheduler()
 
 async def cleanup_drafts() -> None:
     """Clean up old draft requests (older than 7 days)."""
-    async with async_session_maker() as session:
+    async with async_session_maker() as session, UnitOfWork(session):
         repo = RequestRepository()
         threshold = datetime.utcnow() - timedelta(days=7)
         deleted = await repo.cleanup_drafts(session, threshold)
@@ -24,7 +25,7 @@ async def cleanup_drafts() -> None:
 
 
 async def process_notifications() -> None:
-    """Process queued notifications."""
+    """Safety net for the event-driven dispatcher: drain anything still queued."""
     service = NotificationService()
     await service.process_queue()
 
@@ -17,4 +17,9 @@ export const signup = async (payload: SignupPayload): Promise<TokenResponse> =>
 export const me = async (): Promise<User> => {
   const { data } = await client.get<User>('/auth/me');
   return data;
-};
\ No newline at end of file
+};
+
+export const updatePreferences = async (preferences: { email_digest: boolean }): Promise<User> => {
+  const { data } = await client.patch<User>('/auth/me/preferences', preferences);
+  return data;
+};
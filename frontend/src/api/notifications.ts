@@ -1,7 +1,17 @@
 import client from './client';
-import type { Notification } from '../models';
+import type { NotificationPage } from '../models';
 
-export const fetchNotifications = async () => {
-  const { data } = await client.get<Notification[]>('/notifications');
+export const fetchNotifications = async (cursor?: string) => {
+  const { data } = await client.get<NotificationPage>('/notifications', { params: { cursor } });
   return data;
-};
\ No newline at end of file
+};
+
+export const fetchUnreadCount = async () => {
+  const { data } = await client.get<{ unread: number }>('/notifications/unread-count');
+  return data.unread;
+};
+
+export const markNotificationsRead = async (upToId: number) => {
+  const { data } = await client.post<{ unread: number }>('/notifications/read', { up_to_id: upToId });
+  return data.unread;
+};
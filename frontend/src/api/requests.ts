@@ -1,5 +1,5 @@
 import client from './client';
-import type { PaginatedRequests, PickupRequest } from '../models';
+import type { DayAvailability, PaginatedRequests, PickupRequest } from '../models';
 
 export type RequestPayload = {
   category: PickupRequest['category'];
@@ -17,6 +17,7 @@ export const fetchRequests = async (params: { status?: string; category?: string
       status: params.status,
       category: params.category,
       skip: ((params.page || 1) - 1) * 20,
+      include_total: true,
     },
   });
   return data;
@@ -45,4 +46,8 @@ export const confirmSlot = async (id: string, slot_start: string, slot_end: stri
 export const availableSlots = async (date: string, category: string) => {
   const { data } = await client.get(`/slots/available`, { params: { date, category } });
   return data as { start: string; end: string }[];
-};
\ No newline at end of file
+};
+export const slotAvailability = async (from: string, to: string, category: string) => {
+  const { data } = await client.get<DayAvailability[]>(`/slots/availability`, { params: { from, to, category } });
+  return data;
+};
@@ -1,50 +1,130 @@
 import { create } from 'zustand';
 import type { Notification } from '../../models';
-import { fetchNotifications } from '../../api/notifications';
+import { fetchNotifications, fetchUnreadCount, markNotificationsRead } from '../../api/notifications';
 
 type NotificationState = {
   items: Notification[];
+  // Server-maintained unread in-app count, bumped locally for live pushes
   unread: number;
+  nextCursor: string | null;
   socket?: WebSocket;
+  // Highest in-app notification id seen; sent on reconnect so the server replays only the gap
+  lastSeenId?: number;
 };
 
 type NotificationActions = {
   bootstrap: () => Promise<void>;
+  loadMore: () => Promise<void>;
   connect: (token?: string) => void;
-  markRead: () => void;
+  markRead: () => Promise<void>;
 };
 
-export const useNotificationStore = create<NotificationState & NotificationActions>((set, get) => ({
-  items: [],
-  unread: 0,
-
-  bootstrap: async () => {
-    if (!localStorage.getItem('swmra_token')) {
-      set({ items: [], unread: 0 });
-      return;
-    }
-    const items = await fetchNotifications();
-    set({ items, unread: 0 });
-  },
-
-  connect: (token) => {
-    const existing = get().socket;
-    if (existing) {
-      existing.close();
-    }
-    if (!token) {
-      set({ socket: undefined });
-      return;
-    }
+type ControlMessage = { type: 'ping' | 'resync' };
+
+const MAX_RECONNECT_DELAY_MS = 30_000;
+
+const highestInAppId = (items: Notification[]) =>
+  items.reduce<number | undefined>(
+    (max, item) => (item.channel === 'inapp' && (max === undefined || item.id > max) ? item.id : max),
+    undefined,
+  );
+
+export const useNotificationStore = create<NotificationState & NotificationActions>((set, get) => {
+  let reconnectTimer: ReturnType<typeof setTimeout> | undefined;
+  let attempts = 0;
+
+  const open = (token: string) => {
     const base = (import.meta.env.VITE_API_BASE || 'http://localhost:8000').replace('http', 'ws');
-    const socket = new WebSocket(`${base}/ws/notifications?token=${token}`);
+    const lastSeenId = get().lastSeenId;
+    const resume = lastSeenId !== undefined ? `&last_seen_id=${lastSeenId}` : '';
+    const socket = new WebSocket(`${base}/ws/notifications?token=${token}${resume}`);
+    socket.onopen = () => {
+      attempts = 0;
+    };
     socket.onmessage = (event) => {
-      const data = JSON.parse(event.data);
-      set((state) => ({ items: [data, ...state.items], unread: state.unread + 1 }));
+      const data = JSON.parse(event.data) as Notification | ControlMessage;
+      if ('type' in data) {
+        if (data.type === 'resync') {
+          void get().bootstrap();
+        }
+        return;
+      }
+      set((state) => {
+        if (state.items.some((item) => item.id === data.id)) {
+          return state;
+        }
+        return {
+          items: [data, ...state.items],
+          unread: data.channel === 'inapp' && !data.read_at ? state.unread + 1 : state.unread,
+          lastSeenId: data.channel === 'inapp' ? Math.max(data.id, state.lastSeenId ?? 0) : state.lastSeenId,
+        };
+      });
+    };
+    socket.onclose = () => {
+      if (get().socket !== socket) {
+        return;
+      }
+      set({ socket: undefined });
+      const delay = Math.min(1000 * 2 ** attempts, MAX_RECONNECT_DELAY_MS);
+      attempts += 1;
+      reconnectTimer = setTimeout(() => open(token), delay);
     };
-    socket.onclose = () => set({ socket: undefined });
     set({ socket });
-  },
+  };
+
+  return {
+    items: [],
+    unread: 0,
+    nextCursor: null,
+
+    bootstrap: async () => {
+      if (!localStorage.getItem('swmra_token')) {
+        set({ items: [], unread: 0, nextCursor: null, lastSeenId: undefined });
+        return;
+      }
+      const [page, unread] = await Promise.all([fetchNotifications(), fetchUnreadCount()]);
+      set({ items: page.items, unread, nextCursor: page.next_cursor, lastSeenId: highestInAppId(page.items) });
+    },
+
+    loadMore: async () => {
+      const cursor = get().nextCursor;
+      if (!cursor) {
+        return;
+      }
+      const page = await fetchNotifications(cursor);
+      set((state) => ({
+        items: [...state.items, ...page.items.filter((item) => !state.items.some((known) => known.id === item.id))],
+        nextCursor: page.next_cursor,
+      }));
+    },
+
+    connect: (token) => {
+      clearTimeout(reconnectTimer);
+      const existing = get().socket;
+      set({ socket: undefined });
+      if (existing) {
+        existing.close();
+      }
+      if (!token) {
+        return;
+      }
+      attempts = 0;
+      open(token);
+    },
 
-  markRead: () => set({ unread: 0 }),
-}));
\ No newline at end of file
+    markRead: async () => {
+      const upToId = highestInAppId(get().items);
+      if (upToId === undefined || get().unread === 0) {
+        return;
+      }
+      const unread = await markNotificationsRead(upToId);
+      const readAt = new Date().toISOString();
+      set((state) => ({
+        unread,
+        items: state.items.map((item) =>
+          item.channel === 'inapp' && item.id <= upToId && !item.read_at ? { ...item, read_at: readAt } : item,
+        ),
+      }));
+    },
+  };
+});
@@ -2,10 +2,12 @@ import { useState } from 'react';
 import { useNotificationStore } from '../app/store/notifications';
 
 const NotificationBell = () => {
-  const { items, unread, markRead } = useNotificationStore((state) => ({
+  const { items, unread, nextCursor, markRead, loadMore } = useNotificationStore((state) => ({
     items: state.items,
     unread: state.unread,
+    nextCursor: state.nextCursor,
     markRead: state.markRead,
+    loadMore: state.loadMore,
   }));
   const [open, setOpen] = useState(false);
 
@@ -14,7 +16,7 @@ const NotificationBell = () => {
       <button
         onClick={() => {
           setOpen((prev) => !prev);
-          markRead();
+          void markRead();
         }}
         className="relative rounded-full bg-slate-100 p-2 text-slate-600"
         aria-label="Notifications"
@@ -39,6 +41,11 @@ const NotificationBell = () => {
                 <p className="text-slate-600">{item.body}</p>
               </div>
             ))}
+            {nextCursor && (
+              <button onClick={() => void loadMore()} className="w-full text-center text-xs text-slate-500">
+                Load older
+              </button>
+            )}
           </div>
         </div>
       )}
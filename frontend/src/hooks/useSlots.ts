@@ -1,5 +1,16 @@
 import { useEffect, useState } from 'react';
-import { availableSlots } from '../api/requests';
+import { slotAvailability } from '../api/requests';
+
+const WINDOW_DAYS = 14;
+const CACHE_TTL_MS = 60_000;
+// Per category+date slots, filled a window at a time so scrolling dates costs one call per window
+const cache = new Map<string, { slots: { start: string; end: string }[]; at: number }>();
+
+const addDays = (date: string, days: number) => {
+  const value = new Date(`${date}T00:00:00Z`);
+  value.setUTCDate(value.getUTCDate() + days);
+  return value.toISOString().slice(0, 10);
+};
 
 export const useSlots = (date: string | null, category: string | null) => {
   const [slots, setSlots] = useState<{ start: string; end: string }[]>([]);
@@ -10,11 +21,21 @@ export const useSlots = (date: string | null, category: string | null) => {
       setSlots([]);
       return;
     }
+    const key = `${category}:${date}`;
+    const cached = cache.get(key);
+    if (cached && Date.now() - cached.at < CACHE_TTL_MS) {
+      setSlots(cached.slots);
+      return;
+    }
     setLoading(true);
-    availableSlots(date, category)
-      .then(setSlots)
+    slotAvailability(date, addDays(date, WINDOW_DAYS - 1), category)
+      .then((days) => {
+        const at = Date.now();
+        days.forEach((day) => cache.set(`${category}:${day.date}`, { slots: day.slots, at }));
+        setSlots(cache.get(key)?.slots || []);
+      })
       .finally(() => setLoading(false));
   }, [date, category]);
 
   return { slots, loading };
-};
\ No newline at end of file
+};
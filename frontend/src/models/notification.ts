@@ -4,8 +4,14 @@ export type Notification = {
   channel: 'email' | 'sms' | 'push' | 'inapp';
   title: string;
   body: string;
-  status: 'queued' | 'sent' | 'failed';
+  status: 'queued' | 'sending' | 'sent' | 'failed';
   meta?: Record<string, unknown>;
   created_at?: string;
   sent_at?: string | null;
+  read_at?: string | null;
+};
+
+export type NotificationPage = {
+  items: Notification[];
+  next_cursor: string | null;
 };
@@ -12,6 +12,12 @@ export type SlotWindow = {
   end: string;
 };
 
+export type DayAvailability = {
+  date: string;
+  remaining: number;
+  slots: SlotWindow[];
+};
+
 export type RequestStatus =
   | 'draft'
   | 'submitted'
@@ -47,6 +53,7 @@ export type PickupRequest = {
 
 export type PaginatedRequests = {
   items: PickupRequest[];
+  next_cursor?: string | null;
   total: number;
   skip: number;
   limit: number;
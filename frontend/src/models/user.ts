@@ -4,6 +4,7 @@ export type User = {
   email: string;
   phone?: string;
   role: 'citizen' | 'vendor' | 'admin';
+  email_digest?: boolean;
 };
 
 export type TokenResponse = {